@@ -1,16 +1,28 @@
+import hashlib
+import json
 import os
 import re
-from typing import Optional
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from groq import Groq
+from utils.llm_backend import BackendConfigError, get_llm_backend
+from utils.sentence_parser import parse_sentences
+from utils.translation_memory import TranslationMemory, get_translation_memory
+from utils.scheduler import BULK, current_user_id, get_scheduler
+from utils.profiler import get_profiler, render_profiler_panel, timed
+
+# youtube_transcript_api, groq (via utils.llm_backend) and numpy (via
+# utils.difficulty) are imported inside the functions that use them: Streamlit
+# executes this script on every session start and most runs never process a
+# video.
 
 load_dotenv()
 
 st.set_page_config(page_title="French YouTube Translator", page_icon="🇫🇷")
 
+get_profiler().begin_rerun("app")
+
 
 def extract_video_id(url: str) -> Optional[str]:
     """Extract video ID from various YouTube URL formats."""
@@ -25,8 +37,12 @@ def extract_video_id(url: str) -> Optional[str]:
     return None
 
 
-def get_french_transcript(video_id: str) -> Optional[str]:
-    """Fetch French transcript from YouTube video."""
+@timed()
+def get_french_snippets(video_id: str) -> Optional[List[Tuple[str, float]]]:
+    """Fetch the French transcript of a YouTube video as (text, start seconds) snippets."""
+    from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+
     try:
         ytt_api = YouTubeTranscriptApi()
         transcript_list = ytt_api.list(video_id)
@@ -38,8 +54,7 @@ def get_french_transcript(video_id: str) -> Optional[str]:
             return None
 
         transcript_data = transcript.fetch()
-        full_text = ' '.join([snippet.text for snippet in transcript_data])
-        return full_text
+        return [(snippet.text, snippet.start) for snippet in transcript_data]
 
     except TranscriptsDisabled:
         return None
@@ -47,38 +62,183 @@ def get_french_transcript(video_id: str) -> Optional[str]:
         return None
 
 
-def translate_to_english(french_text: str) -> Optional[str]:
-    """Translate French text to English using Groq API."""
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        st.error("GROQ_API_KEY not found in environment variables.")
-        return None
+TRANSLATION_PROMPT = (
+    "You are a professional translator. Translate each line of the following French text to English. "
+    "Return exactly one line of translation per input line, in the same order. "
+    "Provide only the translation, no explanations."
+)
+
+
+def split_translation_units(french_text: str, max_chunk_size: int = 4000) -> List[str]:
+    """Split French text into sentences, slicing any sentence longer than a chunk."""
+    units = []
+    for sentence in parse_sentences(french_text):
+        units.extend(sentence[i:i + max_chunk_size] for i in range(0, len(sentence), max_chunk_size))
+    return units
+
+
+def load_checkpoint(path: str) -> Dict[str, str]:
+    """Load translated chunks saved by an earlier, interrupted run."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("chunks", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path: str, chunks: Dict[str, str]) -> None:
+    """Atomically write the translated chunks so far."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": 1, "chunks": chunks}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
 
-    client = Groq(api_key=api_key)
+
+def chunk_key(chunk_text: str) -> str:
+    """Checkpoint key of a chunk, so resumes survive changes to the chunk plan."""
+    return hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()
+
+
+@timed()
+def translate_to_english(
+    french_text: str,
+    memory: Optional[TranslationMemory] = None,
+    checkpoint_path: Optional[str] = None,
+    on_text: Optional[Callable[[str], None]] = None
+) -> Optional[str]:
+    """
+    Translate French text to English with the configured LLM backend.
+
+    Sentences already in the translation memory (exact or near-duplicate
+    matches) are reused; only the remaining sentences are sent to the model,
+    one per line, and their translations are added to the memory.
+
+    Responses are streamed: `on_text` receives the translation so far as
+    tokens arrive. Each finished chunk is written to `checkpoint_path`, and a
+    retry after a failure reuses the chunks found there.
+
+    Returns None on failure, after showing the reason to the user.
+    """
+    try:
+        backend = get_llm_backend()
+    except BackendConfigError as e:
+        st.error(f"Translation failed: {e} Please check your API key and LLM backend settings.")
+        return None
 
     # Handle long texts by chunking if necessary
     max_chunk_size = 4000
-    chunks = [french_text[i:i + max_chunk_size] for i in range(0, len(french_text), max_chunk_size)]
-
-    translated_chunks = []
-    for chunk in chunks:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a professional translator. Translate the following French text to English. Provide only the translation, no explanations."
-                },
-                {
-                    "role": "user",
-                    "content": chunk
-                }
-            ],
-            temperature=0.3,
+    units = split_translation_units(french_text, max_chunk_size)
+
+    translations: List[Optional[str]] = [None] * len(units)
+    if memory is not None:
+        for i, unit in enumerate(units):
+            match = memory.lookup(unit)
+            if match:
+                translations[i] = match[0]
+
+    pending = [i for i, translation in enumerate(translations) if translation is None]
+    chunks: List[List[int]] = []
+    chunk_size = 0
+    for i in pending:
+        if chunks and chunk_size + len(units[i]) + 1 <= max_chunk_size:
+            chunks[-1].append(i)
+            chunk_size += len(units[i]) + 1
+        else:
+            chunks.append([i])
+            chunk_size = len(units[i])
+
+    def preview(chunk: List[int], partial: str) -> str:
+        parts = []
+        for i, translation in enumerate(translations):
+            if translation:
+                parts.append(translation)
+            elif chunk and i == chunk[0] and partial:
+                parts.append(partial)
+        return ' '.join(parts)
+
+    checkpoint = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    scheduler = get_scheduler()
+    user_id = current_user_id()
+    resumed = 0
+    if on_text:
+        on_text(preview([], ""))
+
+    for n, chunk in enumerate(chunks):
+        chunk_text = "\n".join(units[i] for i in chunk)
+        key = chunk_key(chunk_text)
+
+        if key in checkpoint:
+            content = checkpoint[key]
+            resumed += 1
+        else:
+            try:
+                # Bulk work yields to interactive grading on the shared quota
+                with scheduler.slot(BULK, user_id):
+                    stream = backend.stream(
+                        [
+                            {
+                                "role": "system",
+                                "content": TRANSLATION_PROMPT
+                            },
+                            {
+                                "role": "user",
+                                "content": chunk_text
+                            }
+                        ],
+                        temperature=0.3,
+                    )
+                    pieces = []
+                    last_update = 0.0
+                    for piece in stream:
+                        pieces.append(piece)
+                        # Redraw at most ~10 times per second
+                        if on_text and time.monotonic() - last_update >= 0.1:
+                            on_text(preview(chunk, "".join(pieces).replace("\n", " ")))
+                            last_update = time.monotonic()
+                    content = "".join(pieces)
+            except Exception as e:
+                st.error(
+                    f"Translation stopped at chunk {n + 1} of {len(chunks)}: {e}. "
+                    "Finished chunks are saved; process the video again to resume."
+                )
+                return None
+
+            if checkpoint_path:
+                checkpoint[key] = content
+                save_checkpoint(checkpoint_path, checkpoint)
+
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+
+        if len(lines) == len(chunk):
+            for i, line in zip(chunk, lines):
+                translations[i] = line
+                if memory is not None:
+                    memory.add(units[i], line)
+        else:
+            # Line count drifted, so keep the chunk as one block and don't
+            # record pairs we can't align
+            translations[chunk[0]] = " ".join(lines)
+
+        if on_text:
+            on_text(preview([], ""))
+
+    if memory is not None and units:
+        reused = len(units) - len(pending)
+        saved_chars = sum(len(unit) for unit in units) - sum(len(units[i]) for i in pending)
+        st.caption(
+            f"Translation memory reused {reused} of {len(units)} sentences "
+            f"({saved_chars} characters not sent for translation)."
         )
-        translated_chunks.append(response.choices[0].message.content)
+    if resumed:
+        st.caption(f"Resumed {resumed} of {len(chunks)} chunks from the last attempt.")
 
-    return ' '.join(translated_chunks)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return ' '.join(translation for translation in translations if translation)
 
 
 def save_transcript(content: str, filename: str) -> None:
@@ -87,7 +247,33 @@ def save_transcript(content: str, filename: str) -> None:
         f.write(content)
 
 
+@timed()
+def save_video_record(
+    video_id: str,
+    snippets: List[Tuple[str, float]],
+    english_text: str,
+    difficulty_path: str,
+    catalog_path: str
+) -> int:
+    """
+    Score the aligned practice sentences and record the video in the catalog.
+
+    The difficulty features are also saved to `difficulty_path` for the
+    transcript files, and the catalog record is appended to `catalog_path`.
+    """
+    from utils.catalog import append_records, build_record
+    from utils.difficulty import save_difficulty, score_features
+
+    record = build_record(video_id, snippets, english_text)
+    save_difficulty(difficulty_path, {**record.features, "score": score_features(record.features)}, record.french)
+    append_records(catalog_path, [record])
+    return len(record.french)
+
+
 # Streamlit UI
+with st.sidebar:
+    render_profiler_panel()
+
 st.title("French YouTube Transcript Translator")
 st.write("Enter a French YouTube video URL to extract and translate its transcript.")
 
@@ -103,7 +289,8 @@ if st.button("Process Video", type="primary"):
             st.error("Invalid YouTube URL. Please check the URL and try again.")
         else:
             with st.spinner("Extracting French transcript..."):
-                french_text = get_french_transcript(video_id)
+                snippets = get_french_snippets(video_id)
+                french_text = ' '.join(text for text, _ in snippets) if snippets else None
 
             if not french_text:
                 st.error("No French transcript available for this video.")
@@ -111,19 +298,44 @@ if st.button("Process Video", type="primary"):
                 save_transcript(french_text, "french_transcript.txt")
                 st.success("French transcript extracted and saved!")
 
+                with st.expander("French Transcript", expanded=True):
+                    st.text_area("French Transcript", french_text, height=300, key="french",
+                                 label_visibility="collapsed")
+
+                with st.expander("English Translation", expanded=True):
+                    live_translation = st.empty()
+
+                def show_partial_translation(text: str) -> None:
+                    live_translation.container(height=300).write(text)
+
                 with st.spinner("Translating to English..."):
-                    english_text = translate_to_english(french_text)
+                    memory = get_translation_memory()
+                    english_text = translate_to_english(
+                        french_text,
+                        memory,
+                        checkpoint_path=os.path.join("translation_checkpoints", f"{video_id}.json"),
+                        on_text=show_partial_translation
+                    )
 
                 if english_text:
                     save_transcript(english_text, "english_transcript.txt")
+                    memory.save()
                     st.success("English translation complete and saved!")
 
-                    with st.expander("French Transcript", expanded=True):
-                        st.text_area("", french_text, height=300, key="french")
+                    scored = save_video_record(
+                        video_id, snippets, english_text, "difficulty_features.npz", "video_catalog.bin"
+                    )
+                    st.caption(f"Difficulty scored for {scored} sentence pairs.")
+
+                    live_translation.text_area("English Translation", english_text, height=300, key="english",
+                                               label_visibility="collapsed")
 
-                    with st.expander("English Translation", expanded=True):
-                        st.text_area("", english_text, height=300, key="english")
+                    st.info(
+                        "Files saved: `french_transcript.txt`, `english_transcript.txt` and "
+                        "`difficulty_features.npz`; video added to `video_catalog.bin`"
+                    )
+                elif english_text is not None:
+                    # Failures were already reported by translate_to_english
+                    st.error("The translation came back empty.")
 
-                    st.info("Files saved: `french_transcript.txt` and `english_transcript.txt`")
-                else:
-                    st.error("Translation failed. Please check your API key.")
+get_profiler().end_rerun()
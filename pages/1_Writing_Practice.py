@@ -5,10 +5,12 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.groq_client import get_groq_client
+from utils.llm_backend import BackendConfigError, get_llm_backend
 from utils.sentence_parser import load_and_parse_transcripts
-from utils.llm_evaluator import evaluate_translation
+from utils.llm_evaluator import evaluate_translation, get_evaluation_caller
 from utils.audio_generator import play_french_audio
+from utils.scheduler import SchedulerRejected, get_scheduler
+from utils.profiler import get_profiler, render_profiler_panel, span, timed
 
 st.set_page_config(
     page_title="French Writing Practice",
@@ -16,14 +18,19 @@ st.set_page_config(
     layout="wide"
 )
 
+get_profiler().begin_rerun("practice")
+
 
 def init_session_state():
     """Initialize session state variables."""
     defaults = {
         "sentences": [],
+        "difficulty_scores": [],
+        "difficulty_levels": [],
         "current_index": 0,
         "evaluation_result": None,
         "show_result": False,
+        "submitted_input": "",
         "session_stats": {
             "sentences_completed": 0,
             "total_score": 0,
@@ -37,6 +44,45 @@ def init_session_state():
             st.session_state[key] = value
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def build_errors_html(critical_errors: list, minor_errors: list) -> tuple:
+    """
+    Build the highlighted HTML for critical and minor errors.
+
+    Cached per evaluation result so reruns that redraw the same result
+    don't rebuild the markup.
+    """
+    critical_html = "".join(
+        f"""<div style="background-color: #ffcccc; padding: 10px;
+            border-left: 4px solid #ff0000; margin: 10px 0;
+            border-radius: 4px;">
+<strong style="color: #cc0000;">Type: {error.get('type', 'ERROR')}</strong><br>
+<span style="color: #666;">You wrote:</span>
+<span style="text-decoration: line-through; color: #cc0000;">{error.get('student_wrote', '')}</span><br>
+<span style="color: #666;">Should be:</span>
+<span style="color: #008800; font-weight: bold;">{error.get('original', '')}</span><br>
+<span style="color: #444; font-style: italic;">{error.get('explanation', '')}</span>
+</div>
+"""
+        for error in critical_errors
+    )
+    minor_html = "".join(
+        f"""<div style="background-color: #fff3cd; padding: 10px;
+            border-left: 4px solid #ffc107; margin: 10px 0;
+            border-radius: 4px;">
+<strong style="color: #856404;">Type: {error.get('type', 'ERROR')}</strong><br>
+<span style="color: #666;">You wrote:</span>
+<code>{error.get('student_wrote', '')}</code><br>
+<span style="color: #666;">Should be:</span>
+<code style="color: #155724;">{error.get('original', '')}</code><br>
+<span style="color: #444; font-style: italic;">{error.get('explanation', '')}</span>
+</div>
+"""
+        for error in minor_errors
+    )
+    return critical_html, minor_html
+
+
 def display_errors(result: dict):
     """Display errors with visual highlighting."""
     critical_errors = result.get("critical_errors", [])
@@ -46,57 +92,33 @@ def display_errors(result: dict):
         st.success("No errors found! Great job!")
         return
 
+    critical_html, minor_html = build_errors_html(critical_errors, minor_errors)
+
     if critical_errors:
         st.markdown("#### Critical Errors")
-        for error in critical_errors:
-            st.markdown(
-                f"""
-                <div style="background-color: #ffcccc; padding: 10px;
-                            border-left: 4px solid #ff0000; margin: 10px 0;
-                            border-radius: 4px;">
-                    <strong style="color: #cc0000;">Type: {error.get('type', 'ERROR')}</strong><br>
-                    <span style="color: #666;">You wrote:</span>
-                    <span style="text-decoration: line-through; color: #cc0000;">
-                        {error.get('student_wrote', '')}
-                    </span><br>
-                    <span style="color: #666;">Should be:</span>
-                    <span style="color: #008800; font-weight: bold;">
-                        {error.get('original', '')}
-                    </span><br>
-                    <span style="color: #444; font-style: italic;">
-                        {error.get('explanation', '')}
-                    </span>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+        st.markdown(critical_html, unsafe_allow_html=True)
 
     if minor_errors:
         st.markdown("#### Minor Errors")
-        for error in minor_errors:
-            st.markdown(
-                f"""
-                <div style="background-color: #fff3cd; padding: 10px;
-                            border-left: 4px solid #ffc107; margin: 10px 0;
-                            border-radius: 4px;">
-                    <strong style="color: #856404;">Type: {error.get('type', 'ERROR')}</strong><br>
-                    <span style="color: #666;">You wrote:</span>
-                    <code>{error.get('student_wrote', '')}</code><br>
-                    <span style="color: #666;">Should be:</span>
-                    <code style="color: #155724;">{error.get('original', '')}</code><br>
-                    <span style="color: #444; font-style: italic;">
-                        {error.get('explanation', '')}
-                    </span>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+        st.markdown(minor_html, unsafe_allow_html=True)
 
 
-init_session_state()
+def next_sentence():
+    """Advance to the next sentence and clear the current result."""
+    st.session_state.current_index += 1
+    st.session_state.show_result = False
+    st.session_state.evaluation_result = None
+    st.session_state.submitted_input = ""
 
-# --- SIDEBAR: Progress & Stats ---
-with st.sidebar:
+
+# The sidebar, the input box and the results panel are fragments: a widget
+# interaction inside one of them reruns only that function. Actions that
+# change progress or stats call st.rerun() to refresh the whole page.
+
+@st.fragment
+@timed("render.sidebar")
+def render_sidebar():
+    """Render progress, session stats and the reset button."""
     st.header("Progress")
 
     if st.session_state.sentences:
@@ -121,12 +143,157 @@ with st.sidebar:
     else:
         st.caption("Complete sentences to see stats")
 
+    with st.expander("LLM queue"):
+        queue = get_scheduler().stats()
+        st.caption(
+            f"In flight: {queue['in_flight']}/{queue['max_concurrent']}, "
+            f"waiting: {queue['queue_depth']}"
+        )
+        for name, stats in queue["classes"].items():
+            st.caption(
+                f"{name}: {stats['queue_depth']} waiting, p95 wait {stats['wait_p95_ms']:.0f} ms, "
+                f"{stats['shed']} shed, {stats['rejected']} rejected"
+            )
+        hedging = get_evaluation_caller().stats()
+        st.caption(
+            f"grading: {hedging['hedge_rate']:.0%} hedged, hedges won {hedging['hedge_win_rate']:.0%}, "
+            f"{hedging['timeouts']} timed out"
+        )
+
     st.divider()
     if st.button("Reset Session", type="secondary"):
         for key in list(st.session_state.keys()):
             del st.session_state[key]
         st.rerun()
 
+
+@st.fragment
+@timed("render.practice_input")
+def practice_input(idx: int, french_original: str, english_ref: str):
+    """Render the English prompt, the answer box and the action buttons."""
+    # Display English prompt
+    st.subheader("Translate this sentence to French:")
+    st.markdown(f"**{english_ref}**")
+    if idx < len(st.session_state.difficulty_scores):
+        difficulty = st.session_state.difficulty_scores[idx]
+        level = st.session_state.difficulty_levels[idx]
+        st.caption(f"Difficulty: {level} ({difficulty:.0f}/100)")
+
+    # User input
+    user_input = st.text_area(
+        "Your French translation:",
+        key=f"user_input_{idx}",
+        height=100,
+        placeholder="Type your French translation here..."
+    )
+
+    # Buttons row
+    col1, col2, col3 = st.columns([1, 1, 1])
+
+    with col1:
+        submit_disabled = not user_input.strip() or st.session_state.show_result
+        if st.button("Check Translation", type="primary", disabled=submit_disabled):
+            with st.spinner("Evaluating your translation..."):
+                try:
+                    backend = get_llm_backend()
+                except BackendConfigError as e:
+                    st.error(str(e))
+                    st.stop()
+                try:
+                    result = evaluate_translation(
+                        french_original,
+                        english_ref,
+                        user_input,
+                        backend
+                    )
+                except SchedulerRejected:
+                    st.error("The evaluator is busy right now. Please try again in a moment.")
+                    return
+                if result.get("error"):
+                    # Not a grade: keep the answer submittable and the stats unchanged
+                    st.error(result["feedback"])
+                    return
+
+                st.session_state.evaluation_result = result
+                st.session_state.submitted_input = user_input
+                st.session_state.show_result = True
+
+                # Update stats
+                stats = st.session_state.session_stats
+                stats["sentences_completed"] += 1
+                stats["total_score"] += result.get("overall_score", 0)
+                stats["critical_errors"] += len(result.get("critical_errors", []))
+                stats["minor_errors"] += len(result.get("minor_errors", []))
+                if result.get("overall_score", 0) >= 95:
+                    stats["perfect_count"] += 1
+
+                st.rerun()
+
+    with col2:
+        if st.button("Skip Sentence"):
+            next_sentence()
+            st.rerun()
+
+    with col3:
+        if st.button("Show Original"):
+            st.info(f"**Original French:** {french_original}")
+
+
+@st.fragment
+@timed("render.results_panel")
+def results_panel(french_original: str):
+    """Render the score, error highlighting, feedback and audio for a result."""
+    result = st.session_state.evaluation_result
+
+    st.divider()
+
+    # Score display
+    score = result.get("overall_score", 0)
+    if score >= 90:
+        st.success(f"### Score: {score}/100 - Excellent!")
+    elif score >= 70:
+        st.info(f"### Score: {score}/100 - Good job!")
+    elif score >= 50:
+        st.warning(f"### Score: {score}/100 - Keep practicing!")
+    else:
+        st.error(f"### Score: {score}/100 - Needs improvement")
+
+    # Original vs User comparison
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Original French:**")
+        st.code(french_original, language=None)
+        play_french_audio(french_original)
+    with col2:
+        st.markdown("**Your Translation:**")
+        st.code(st.session_state.submitted_input, language=None)
+
+    # Error highlighting
+    display_errors(result)
+
+    # Feedback
+    st.markdown("### Feedback")
+    st.write(result.get("feedback", ""))
+
+    # Corrected version
+    if result.get("corrected_version"):
+        st.markdown("**Suggested correction:**")
+        st.success(result["corrected_version"])
+        play_french_audio(result["corrected_version"])
+
+    # Next button
+    if st.button("Next Sentence", type="primary"):
+        next_sentence()
+        st.rerun()
+
+
+init_session_state()
+
+# --- SIDEBAR: Progress & Stats ---
+with st.sidebar:
+    render_sidebar()
+    render_profiler_panel()
+
 # --- MAIN CONTENT ---
 st.title("French Writing Practice")
 st.write("Translate English sentences into French and get instant feedback.")
@@ -138,25 +305,69 @@ if not st.session_state.sentences:
     # Check if files exist
     french_path = "french_transcript.txt"
     english_path = "english_transcript.txt"
+    catalog_path = "video_catalog.bin"
 
     french_exists = os.path.exists(french_path)
     english_exists = os.path.exists(english_path)
+    files_exist = french_exists and english_exists
 
-    if not french_exists or not english_exists:
+    if not files_exist and not os.path.exists(catalog_path):
         st.warning("Transcript files not found. Please extract a video from the main page first.")
         if not french_exists:
             st.caption("Missing: french_transcript.txt")
         if not english_exists:
             st.caption("Missing: english_transcript.txt")
     else:
-        if st.button("Load Transcripts", type="primary"):
+        # numpy is only needed while choosing and loading sentences
+        from utils.difficulty import LEVELS, difficulty_levels, ensure_difficulty, score_features, select_sentences
+
+        latest_files = "Latest transcript files"
+        catalog = {}
+        source = latest_files
+        if os.path.exists(catalog_path):
+            from utils.catalog import SnapshotError, get_catalog
+
             try:
-                aligned = load_and_parse_transcripts(french_path, english_path)
+                catalog = get_catalog(catalog_path)
+            except SnapshotError as e:
+                st.warning(f"Video catalog could not be read: {e}")
+            if catalog:
+                options = ([latest_files] if files_exist else []) + sorted(catalog)
+                source = st.selectbox("Video", options)
+
+        order = st.radio("Sentence order", ["Transcript order", "Easiest first"], horizontal=True)
+        levels = st.multiselect("Difficulty levels", list(LEVELS), default=list(LEVELS))
+
+        if st.button("Load Transcripts", type="primary", disabled=not levels):
+            try:
+                with span("load_transcripts"):
+                    if source in catalog:
+                        record = catalog[source]
+                        aligned = record.pairs()
+                        scores = score_features(record.features)
+                    elif files_exist:
+                        aligned = load_and_parse_transcripts(french_path, english_path)
+                        if aligned:
+                            scores = ensure_difficulty(
+                                "difficulty_features.npz",
+                                [french for french, _ in aligned]
+                            )["score"]
+                    else:
+                        aligned = []
 
                 if aligned:
-                    st.session_state.sentences = aligned
-                    st.success(f"Loaded {len(aligned)} sentence pairs!")
-                    st.rerun()
+                    selected = select_sentences(scores, levels, sort=order == "Easiest first")
+
+                    if len(selected):
+                        st.session_state.sentences = [aligned[i] for i in selected]
+                        st.session_state.difficulty_scores = scores[selected].tolist()
+                        st.session_state.difficulty_levels = [
+                            LEVELS[level] for level in difficulty_levels(scores[selected])
+                        ]
+                        st.success(f"Loaded {len(selected)} sentence pairs!")
+                        st.rerun()
+                    else:
+                        st.error("No sentences match the selected difficulty levels.")
                 else:
                     st.error("Could not parse sentences from transcripts.")
 
@@ -171,103 +382,11 @@ else:
     if idx < len(sentences):
         french_original, english_ref = sentences[idx]
 
-        # Display English prompt
-        st.subheader("Translate this sentence to French:")
-        st.markdown(f"**{english_ref}**")
-
-        # User input
-        user_input = st.text_area(
-            "Your French translation:",
-            key=f"user_input_{idx}",
-            height=100,
-            placeholder="Type your French translation here..."
-        )
-
-        # Buttons row
-        col1, col2, col3 = st.columns([1, 1, 1])
-
-        with col1:
-            submit_disabled = not user_input.strip() or st.session_state.show_result
-            if st.button("Check Translation", type="primary", disabled=submit_disabled):
-                with st.spinner("Evaluating your translation..."):
-                    client = get_groq_client()
-                    result = evaluate_translation(
-                        french_original,
-                        english_ref,
-                        user_input,
-                        client
-                    )
-                    st.session_state.evaluation_result = result
-                    st.session_state.show_result = True
-
-                    # Update stats
-                    stats = st.session_state.session_stats
-                    stats["sentences_completed"] += 1
-                    stats["total_score"] += result.get("overall_score", 0)
-                    stats["critical_errors"] += len(result.get("critical_errors", []))
-                    stats["minor_errors"] += len(result.get("minor_errors", []))
-                    if result.get("overall_score", 0) >= 95:
-                        stats["perfect_count"] += 1
-
-                    st.rerun()
-
-        with col2:
-            if st.button("Skip Sentence"):
-                st.session_state.current_index += 1
-                st.session_state.show_result = False
-                st.session_state.evaluation_result = None
-                st.rerun()
-
-        with col3:
-            if st.button("Show Original"):
-                st.info(f"**Original French:** {french_original}")
+        practice_input(idx, french_original, english_ref)
 
         # --- EVALUATION RESULTS ---
         if st.session_state.show_result and st.session_state.evaluation_result:
-            result = st.session_state.evaluation_result
-
-            st.divider()
-
-            # Score display
-            score = result.get("overall_score", 0)
-            if score >= 90:
-                st.success(f"### Score: {score}/100 - Excellent!")
-            elif score >= 70:
-                st.info(f"### Score: {score}/100 - Good job!")
-            elif score >= 50:
-                st.warning(f"### Score: {score}/100 - Keep practicing!")
-            else:
-                st.error(f"### Score: {score}/100 - Needs improvement")
-
-            # Original vs User comparison
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("**Original French:**")
-                st.code(french_original, language=None)
-                play_french_audio(french_original)
-            with col2:
-                st.markdown("**Your Translation:**")
-                st.code(user_input, language=None)
-
-            # Error highlighting
-            display_errors(result)
-
-            # Feedback
-            st.markdown("### Feedback")
-            st.write(result.get("feedback", ""))
-
-            # Corrected version
-            if result.get("corrected_version"):
-                st.markdown("**Suggested correction:**")
-                st.success(result["corrected_version"])
-                play_french_audio(result["corrected_version"])
-
-            # Next button
-            if st.button("Next Sentence", type="primary"):
-                st.session_state.current_index += 1
-                st.session_state.show_result = False
-                st.session_state.evaluation_result = None
-                st.rerun()
+            results_panel(french_original)
 
     else:
         # Session complete
@@ -296,3 +415,5 @@ else:
                 "perfect_count": 0
             }
             st.rerun()
+
+get_profiler().end_rerun()
@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+import tools.load_test as load_test
+import utils.llm_backend as llm_backend
+import utils.translation_memory as translation_memory
+from tools.load_test import APP_SCRIPT, FAKE_VIDEO_URL, offline_environment
+from utils.catalog import load_catalog
+from utils.llm_backend import FakeBackend
+
+# ~9000 characters, so the transcript is translated in three chunks
+LONG_TRANSCRIPT = [
+    f"Phrase numéro {i}, " + "nous parlons longuement de la cuisine française et du marché. " * 5
+    for i in range(30)
+]
+
+
+class FlakyBackend(FakeBackend):
+    """Fake backend that fails on a chosen request."""
+
+    def __init__(self, fail_on_call=None):
+        super().__init__()
+        self.fail_on_call = fail_on_call
+
+    def stream(self, messages, temperature=0.3, timeout=None, cancel=None):
+        if len(self.calls) + 1 == self.fail_on_call:
+            self.calls.append(messages)
+            raise ConnectionError("connection reset")
+        return super().stream(messages, temperature, timeout, cancel)
+
+
+def process_video() -> AppTest:
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=30).run()
+    app.text_input[0].set_value(FAKE_VIDEO_URL)
+    next(b for b in app.button if b.label == "Process Video").click()
+    return app.run()
+
+
+class TestStreamingTranslation:
+    """Test cases for streamed, checkpointed translation in app.py."""
+
+    def test_resumes_from_last_finished_chunk(self, tmp_path, monkeypatch):
+        """Test that a retry only translates the chunks that did not finish."""
+        monkeypatch.setattr(load_test, "FAKE_TRANSCRIPT", LONG_TRANSCRIPT)
+        backend = FlakyBackend(fail_on_call=2)
+
+        with offline_environment(str(tmp_path), backend=backend):
+            monkeypatch.setattr(translation_memory, "_memory", None)
+            app = process_video()
+
+            assert not app.exception
+            assert any("Translation stopped at chunk 2 of 3" in e.value for e in app.error)
+            assert not any("API key" in e.value for e in app.error)
+            assert os.path.exists("french_transcript.txt")
+            assert not os.path.exists("english_transcript.txt")
+            assert os.listdir("translation_checkpoints")
+            first_chunk = backend.calls[0][-1]["content"]
+
+            # A fresh process: the translation memory was never saved
+            monkeypatch.setattr(translation_memory, "_memory", None)
+            backend.fail_on_call = None
+            backend.calls.clear()
+            app = process_video()
+
+            assert not app.exception
+            sent = [messages[-1]["content"] for messages in backend.calls]
+            assert len(sent) == 2
+            assert first_chunk not in sent
+            assert any("Resumed 1 of 3 chunks" in c.value for c in app.caption)
+
+            with open("english_transcript.txt", encoding="utf-8") as f:
+                english = f.read()
+            assert english.count("In English:") == len(LONG_TRANSCRIPT)
+            assert not os.listdir("translation_checkpoints")
+
+            record = load_catalog("video_catalog.bin")["loadtest000"]
+            assert len(record.french) == len(LONG_TRANSCRIPT)
+            assert record.starts[-1] == 4.0 * (len(LONG_TRANSCRIPT) - 1)
+
+    def test_configuration_error(self, tmp_path, monkeypatch):
+        """Test that a missing backend setting is reported once, with the settings hint."""
+        monkeypatch.setenv("LLM_BACKEND", "openai")
+        monkeypatch.delenv("LLM_BASE_URL", raising=False)
+        monkeypatch.delenv("LLM_FALLBACK_BACKEND", raising=False)
+
+        with offline_environment(str(tmp_path)):
+            # Restored by offline_environment
+            llm_backend._backend = None
+            monkeypatch.setattr(translation_memory, "_memory", None)
+            app = process_video()
+
+            assert not app.exception
+            errors = [e.value for e in app.error]
+            assert len(errors) == 1
+            assert "LLM_BASE_URL" in errors[0] and "API key" in errors[0]
+            assert not os.path.exists("english_transcript.txt")
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -2,9 +2,20 @@ import sys
 import os
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@pytest.fixture(autouse=True)
+def audio_store(tmp_path, monkeypatch):
+    """Keep stored audio out of the working directory and between tests."""
+    import utils.audio_generator as audio_generator
+    monkeypatch.setattr(audio_generator, "AUDIO_STORE_DIR", str(tmp_path / "audio_cache"))
+    audio_generator.synthesize_french_audio.clear()
+    return audio_generator
+
+
 class TestPlayFrenchAudio:
     """Test cases for play_french_audio() function."""
 
@@ -28,6 +39,20 @@ class TestPlayFrenchAudio:
         mock_gtts.assert_called_once_with(text="Bonjour le monde", lang='fr', slow=False)
         mock_st.audio.assert_called_once()
 
+    @patch('utils.audio_generator.gTTS')
+    @patch('utils.audio_generator.st')
+    def test_caches_audio_per_text(self, mock_st, mock_gtts):
+        """Test that replaying the same text reuses the synthesized audio."""
+        from utils.audio_generator import play_french_audio
+
+        mock_gtts.return_value.write_to_fp.side_effect = lambda fp: fp.write(b"fake_audio_data")
+
+        assert play_french_audio("Merci beaucoup") is True
+        assert play_french_audio("Merci beaucoup") is True
+
+        mock_gtts.assert_called_once()
+        assert mock_st.audio.call_count == 2
+
     @patch('utils.audio_generator.st')
     def test_returns_false_for_empty_text(self, mock_st):
         """Test that empty text returns False."""
@@ -52,6 +77,31 @@ class TestPlayFrenchAudio:
         mock_st.caption.assert_called_once()
 
 
+
+class TestAudioStore:
+    """Test cases for the audio store keyed by catalog audio keys."""
+
+    @patch('utils.audio_generator.gTTS')
+    def test_synthesized_audio_is_stored(self, mock_gtts, audio_store):
+        """Test that synthesized audio is saved under the sentence's audio key."""
+        from utils.catalog import audio_key
+
+        mock_gtts.return_value.write_to_fp.side_effect = lambda fp: fp.write(b"fake_audio_data")
+
+        assert audio_store.synthesize_french_audio("Il pleut.") == b"fake_audio_data"
+        assert audio_store.load_stored_audio(audio_key("Il pleut.")) == b"fake_audio_data"
+
+    @patch('utils.audio_generator.gTTS')
+    def test_stored_audio_skips_synthesis(self, mock_gtts, audio_store):
+        """Test that audio already in the store is served without gTTS."""
+        from utils.catalog import audio_key
+
+        audio_store.store_audio(audio_key("Il neige."), b"stored_audio")
+
+        assert audio_store.synthesize_french_audio("Il neige.") == b"stored_audio"
+        mock_gtts.assert_not_called()
+
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__, "-v"])
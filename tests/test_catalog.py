@@ -0,0 +1,224 @@
+import sys
+import os
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.catalog_snapshot import export_catalog, import_snapshot, run_benchmark, synthetic_records
+from utils.catalog import (
+    SnapshotError,
+    append_records,
+    audio_key,
+    build_record,
+    get_catalog,
+    iter_snapshot,
+    load_catalog,
+    sentence_starts,
+    write_snapshot,
+)
+from utils.difficulty import FEATURE_NAMES, compute_features
+
+SNIPPETS = [
+    ("Bonjour à tous. Aujourd'hui, nous", 0.0),
+    ("allons au marché. Il est 20h30.", 3.5),
+    ("Merci d'avoir regardé !", 7.25),
+]
+ENGLISH = "Hello everyone. Today, we are going to the market. It is 8:30 pm. Thanks for watching!"
+
+
+def assert_same_record(actual, expected):
+    assert actual.video_id == expected.video_id
+    assert actual.french == expected.french
+    assert actual.english == expected.english
+    assert actual.audio_keys == expected.audio_keys
+    np.testing.assert_array_equal(actual.starts, expected.starts)
+    for name in FEATURE_NAMES:
+        np.testing.assert_array_equal(actual.features[name], expected.features[name])
+
+
+class TestBuildRecord:
+    """Test cases for build_record() and sentence_starts()."""
+
+    def test_record(self):
+        """Test pairs, timestamps, features and audio keys of a video."""
+        record = build_record("abc", SNIPPETS, ENGLISH)
+
+        assert record.pairs()[1] == ("Aujourd'hui, nous allons au marché.", "Today, we are going to the market.")
+        assert record.starts.tolist() == [0.0, 0.0, 3.5, 7.25]
+        expected = compute_features(record.french)
+        for name in FEATURE_NAMES:
+            np.testing.assert_allclose(record.features[name], expected[name], rtol=1e-6)
+        assert record.audio_keys[0] == audio_key("Bonjour à tous.")
+        assert len(record.audio_keys[0]) == 32
+
+    def test_unmatched_sentence_keeps_previous_start(self):
+        """Test that a sentence not found in the snippets reuses the last start."""
+        starts = sentence_starts([("Un. Deux.", 1.0), ("Trois.", 2.0)], ["Un.", "Absent.", "Trois."])
+
+        assert starts.tolist() == [1.0, 1.0, 2.0]
+
+
+class TestSnapshot:
+    """Test cases for writing and reading snapshots."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that every column survives a write and a streaming read."""
+        path = str(tmp_path / "catalog.bin")
+        records = [build_record("abc", SNIPPETS, ENGLISH)] + list(synthetic_records(5, 3))
+        write_snapshot(path, records, block_videos=2)
+
+        loaded = list(iter_snapshot(path))
+
+        assert len(loaded) == len(records)
+        for actual, expected in zip(loaded, records):
+            assert_same_record(actual, expected)
+
+    def test_append_and_latest_wins(self, tmp_path):
+        """Test that appended blocks are read and reprocessed videos replace old records."""
+        path = str(tmp_path / "catalog.bin")
+        first = build_record("abc", SNIPPETS, ENGLISH)
+        second = build_record("abc", SNIPPETS[:1], "Hello everyone.")
+        empty = build_record("silent", [], "")
+
+        append_records(path, [first])
+        append_records(path, [empty, second])
+        catalog = load_catalog(path)
+
+        assert sorted(catalog) == ["abc", "silent"]
+        assert_same_record(catalog["abc"], second)
+        assert catalog["silent"].french == []
+
+    def test_checksum_mismatch(self, tmp_path):
+        """Test that a flipped byte in a block is detected."""
+        path = str(tmp_path / "catalog.bin")
+        write_snapshot(path, synthetic_records(3, 4))
+        data = bytearray(open(path, "rb").read())
+        data[-10] ^= 0xFF
+        open(path, "wb").write(bytes(data))
+
+        with pytest.raises(SnapshotError, match="checksum"):
+            load_catalog(path)
+
+    def test_truncated(self, tmp_path):
+        """Test that a snapshot cut short is rejected."""
+        path = str(tmp_path / "catalog.bin")
+        write_snapshot(path, synthetic_records(3, 4))
+        data = open(path, "rb").read()
+        open(path, "wb").write(data[:-5])
+
+        with pytest.raises(SnapshotError, match="Truncated"):
+            load_catalog(path)
+
+    def test_torn_append_keeps_earlier_blocks(self, tmp_path):
+        """Test that a block cut short by a crash hides only itself, and the next append replaces it."""
+        path = str(tmp_path / "catalog.bin")
+        records = list(synthetic_records(3, 4))
+        append_records(path, records[:1])
+        append_records(path, records[1:2])
+        good_size = os.path.getsize(path)
+        append_records(path, records[2:])
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 5)
+
+        with pytest.raises(SnapshotError, match="Truncated"):
+            load_catalog(path)
+        assert sorted(load_catalog(path, skip_torn_tail=True)) == ["video0000000", "video0000001"]
+        assert sorted(get_catalog(path)) == ["video0000000", "video0000001"]
+
+        append_records(path, records[2:])
+        assert os.path.getsize(path) > good_size
+        assert sorted(load_catalog(path)) == ["video0000000", "video0000001", "video0000002"]
+
+    def test_torn_header_is_rewritten(self, tmp_path):
+        """Test that an append after a crash during the first header write starts the file over."""
+        path = str(tmp_path / "catalog.bin")
+        with open(path, "wb") as f:
+            f.write(b"FLCAT")
+
+        append_records(path, list(synthetic_records(1, 2)))
+
+        assert sorted(load_catalog(path)) == ["video0000000"]
+
+    def test_concurrent_appends(self, tmp_path):
+        """Test that simultaneous first appends write one header and every block."""
+        path = str(tmp_path / "catalog.bin")
+        records = list(synthetic_records(16, 3))
+        threads = [threading.Thread(target=append_records, args=(path, [record])) for record in records]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(load_catalog(path)) == 16
+
+    def test_not_a_snapshot(self, tmp_path):
+        """Test that other files are rejected."""
+        path = tmp_path / "notes.txt"
+        path.write_text("Bonjour")
+
+        with pytest.raises(SnapshotError):
+            load_catalog(str(path))
+
+
+class TestCatalogSnapshotTool:
+    """Test cases for export, import and the load benchmark."""
+
+    def test_export_then_import(self, tmp_path):
+        """Test that a fresh catalog is warmed from an exported snapshot."""
+        source = str(tmp_path / "source.bin")
+        snapshot = str(tmp_path / "snapshot.bin")
+        replica = str(tmp_path / "replica.bin")
+        append_records(source, [build_record("abc", SNIPPETS, ENGLISH)])
+        append_records(source, list(synthetic_records(2, 3)))
+        append_records(replica, [build_record("local", SNIPPETS[:1], "Hello everyone.")])
+
+        assert export_catalog(source, snapshot) == 3
+        assert import_snapshot(snapshot, replica) == 3
+
+        catalog = load_catalog(replica)
+        assert sorted(catalog) == ["abc", "local", "video0000000", "video0000001"]
+        assert_same_record(catalog["abc"], load_catalog(source)["abc"])
+
+    def test_appends_during_import_are_kept(self, tmp_path):
+        """Test that videos appended while a snapshot is imported are not lost."""
+        snapshot = str(tmp_path / "snapshot.bin")
+        replica = str(tmp_path / "replica.bin")
+        write_snapshot(snapshot, synthetic_records(200, 20))
+        appended = [build_record(f"local{i}", SNIPPETS, ENGLISH) for i in range(16)]
+        threads = [threading.Thread(target=append_records, args=(replica, [record])) for record in appended]
+
+        for thread in threads:
+            thread.start()
+        import_snapshot(snapshot, replica)
+        for thread in threads:
+            thread.join()
+
+        assert len(load_catalog(replica)) == 216
+
+    def test_corrupted_import_leaves_catalog(self, tmp_path):
+        """Test that importing a corrupted snapshot does not touch the local catalog."""
+        snapshot = str(tmp_path / "snapshot.bin")
+        replica = str(tmp_path / "replica.bin")
+        write_snapshot(snapshot, synthetic_records(2, 3))
+        open(snapshot, "ab").write(b"\x00" * 7)
+        append_records(replica, [build_record("local", SNIPPETS, ENGLISH)])
+        before = open(replica, "rb").read()
+
+        with pytest.raises(SnapshotError):
+            import_snapshot(snapshot, replica)
+        assert open(replica, "rb").read() == before
+
+    def test_benchmark(self):
+        """Test a small benchmark run."""
+        report = run_benchmark(videos=50, sentences=4)
+
+        assert report["videos"] == report["streamed_videos"] == 50
+        assert report["sentences"] == 200
+        assert report["load_s"] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
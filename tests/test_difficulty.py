@@ -0,0 +1,164 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.difficulty as difficulty
+from utils.difficulty import (
+    LEVELS,
+    compute_features,
+    difficulty_levels,
+    ensure_difficulty,
+    is_rare_tense,
+    load_difficulty,
+    save_difficulty,
+    score_sentences,
+    select_sentences,
+)
+
+SIMPLE = "Bonjour."
+MEDIUM = "Il fallait qu'ils fussent présents, quoiqu'ils ne le voulussent point."
+HARD = (
+    "Lorsque les ambassadeurs arrivèrent au palais, ils trouvèrent le roi, "
+    "entouré de ses conseillers, qui délibérait gravement sur la question ; "
+    "personne ne savait, à vrai dire, quelle décision il prendrait."
+)
+
+
+class TestComputeFeatures:
+    """Test cases for compute_features() function."""
+
+    def test_word_and_punctuation_counts(self):
+        """Test that words and punctuation marks are counted per sentence."""
+        features = compute_features(["Merci d'avoir regardé cette vidéo.", HARD])
+
+        assert features["word_count"].tolist() == [6, 30]
+        assert features["punctuation_count"].tolist() == [0, 6]
+
+    def test_rare_tenses(self):
+        """Test detection of passé simple and imparfait du subjonctif."""
+        features = compute_features([HARD, MEDIUM, "J'aime le goût du café."])
+
+        assert features["rare_tense_count"].tolist() == [2, 2, 0]
+
+    def test_rare_tense_false_positives(self):
+        """Test that nouns and present-tense verbs sharing the endings are not counted."""
+        features = compute_features([
+            "Ils passent les discussions sur les pâtes et les boîtes.",
+            "Nous finissions les missions, elles poussent et classent les gîtes.",
+            "Ça me plaît, il connaît les passions des percussions.",
+        ])
+
+        assert features["rare_tense_count"].tolist() == [0, 0, 0]
+
+    def test_rare_tense_forms(self):
+        """Test that genuine rare forms with short or vowel stems are still counted."""
+        assert is_rare_tense("fussent")
+        assert is_rare_tense("eûmes")
+        assert is_rare_tense("vîtes")
+        assert is_rare_tense("parlassent")
+        assert is_rare_tense("fût")
+        assert not is_rare_tense("passent")
+        assert not is_rare_tense("discussions")
+
+    def test_rare_words(self):
+        """Test that words missing from the frequency list count as rare."""
+        features = compute_features(["Je suis content.", "Les ambassadeurs délibèrent."])
+
+        assert features["rare_word_ratio"][0] == 0
+        assert features["rare_word_ratio"][1] == 2 / 3
+
+    def test_empty_inputs(self):
+        """Test that empty batches and empty sentences are handled."""
+        assert len(compute_features([])["word_count"]) == 0
+
+        features = compute_features(["", "..."])
+        assert features["word_count"].tolist() == [0, 0]
+        assert features["mean_log_rank"].tolist() == [0, 0]
+
+
+class TestScoring:
+    """Test cases for scores, levels and session selection."""
+
+    def test_scores_increase_with_complexity(self):
+        """Test that longer, rarer sentences score as harder."""
+        scores = score_sentences([SIMPLE, MEDIUM, HARD])["score"]
+
+        assert scores[0] < scores[1] < scores[2]
+        assert difficulty_levels(scores).tolist() == [0, 1, 2]
+
+    def test_select_filters_and_sorts(self):
+        """Test level filtering and easiest-first ordering."""
+        scores = np.array([70.0, 10.0, 40.0, 20.0])
+
+        assert select_sentences(scores).tolist() == [0, 1, 2, 3]
+        assert select_sentences(scores, sort=True).tolist() == [1, 3, 2, 0]
+        assert select_sentences(scores, [LEVELS[0]]).tolist() == [1, 3]
+        assert select_sentences(scores, [LEVELS[1], LEVELS[2]], sort=True).tolist() == [2, 0]
+
+    def test_scores_large_catalog_quickly(self):
+        """Test that a 100k sentence catalog is scored in seconds."""
+        sentences = [SIMPLE, MEDIUM, HARD, "Je vais au marché demain matin."] * 25000
+
+        start = time.perf_counter()
+        scores = score_sentences(sentences)["score"]
+        elapsed = time.perf_counter() - start
+
+        assert len(scores) == 100000
+        assert elapsed < 10
+
+
+class TestPersistence:
+    """Test cases for saving and loading difficulty features."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that saved features load back unchanged."""
+        path = str(tmp_path / "difficulty_features.npz")
+        features = score_sentences([SIMPLE, HARD])
+
+        save_difficulty(path, features, [SIMPLE, HARD])
+        loaded = load_difficulty(path, [SIMPLE, HARD])
+
+        assert set(loaded) == set(features)
+        np.testing.assert_allclose(loaded["score"], features["score"])
+
+    def test_stale_features_are_recomputed(self, tmp_path):
+        """Test that features saved for another transcript are replaced."""
+        path = str(tmp_path / "difficulty_features.npz")
+        save_difficulty(path, score_sentences([SIMPLE]), [SIMPLE])
+
+        assert load_difficulty(path, [SIMPLE, MEDIUM, HARD]) is None
+        features = ensure_difficulty(path, [SIMPLE, MEDIUM, HARD])
+
+        assert len(features["score"]) == 3
+        assert len(load_difficulty(path, [SIMPLE, MEDIUM, HARD])["score"]) == 3
+
+    def test_same_count_different_sentences(self, tmp_path):
+        """Test that features of another transcript with as many sentences are not reused."""
+        path = str(tmp_path / "difficulty_features.npz")
+        save_difficulty(path, score_sentences([SIMPLE, MEDIUM]), [SIMPLE, MEDIUM])
+
+        assert load_difficulty(path, [SIMPLE, HARD]) is None
+
+    def test_other_scoring_version(self, tmp_path, monkeypatch):
+        """Test that features saved by another scoring version, or with none, are recomputed."""
+        path = str(tmp_path / "difficulty_features.npz")
+        save_difficulty(path, score_sentences([SIMPLE]), [SIMPLE])
+        monkeypatch.setattr(difficulty, "SCORING_VERSION", difficulty.SCORING_VERSION + 1)
+        assert load_difficulty(path, [SIMPLE]) is None
+
+        # Written before versions were saved
+        np.savez_compressed(path, **score_sentences([SIMPLE]))
+        assert load_difficulty(path, [SIMPLE]) is None
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file returns None."""
+        assert load_difficulty(str(tmp_path / "missing.npz"), [SIMPLE]) is None
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
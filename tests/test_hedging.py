@@ -0,0 +1,155 @@
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.hedging import HedgedCaller
+
+
+class HeavyTailBackend:
+    """Fake backend whose latencies follow a fixed, repeating pattern."""
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.calls = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, cancel, seconds_left):
+        with self._lock:
+            latency = self.latencies[self.calls % len(self.latencies)]
+            self.calls += 1
+        if cancel.wait(min(latency, seconds_left)):
+            with self._lock:
+                self.cancelled += 1
+            raise RuntimeError("cancelled")
+        if latency > seconds_left:
+            raise TimeoutError("client timeout")
+        return latency
+
+
+class FailingBackend:
+    """Fake backend that fails a given number of times, then answers."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, cancel, seconds_left):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("reset")
+        return "ok"
+
+
+class TestHedgedCaller:
+    """Test cases for HedgedCaller."""
+
+    def test_fast_call_is_not_hedged(self):
+        """Test that a call answering before the hedge delay runs once."""
+        backend = HeavyTailBackend([0.01])
+        caller = HedgedCaller(deadline=1.0, initial_hedge_delay=0.2)
+
+        assert caller.call(backend) == 0.01
+        assert backend.calls == 1
+        assert caller.stats()["primary_wins"] == 1
+
+    def test_hedge_cuts_tail_latency(self):
+        """Test that slow outliers are answered by the hedge."""
+        # Every fifth request takes a second; the rest take 10 ms
+        backend = HeavyTailBackend([0.01, 0.01, 0.01, 0.01, 1.0])
+        caller = HedgedCaller(deadline=2.0, min_samples=4, initial_hedge_delay=0.05)
+
+        durations = []
+        for _ in range(20):
+            start = time.monotonic()
+            caller.call(backend)
+            durations.append(time.monotonic() - start)
+
+        stats = caller.stats()
+        assert max(durations) < 0.5
+        assert stats["hedged"] >= 4
+        assert stats["hedge_wins"] >= 4
+        assert stats["timeouts"] == 0
+
+    def test_loser_is_cancelled(self):
+        """Test that the slower attempt is told to stop once the other wins."""
+        backend = HeavyTailBackend([1.0, 0.01])
+        caller = HedgedCaller(deadline=2.0, initial_hedge_delay=0.05)
+
+        assert caller.call(backend) == 0.01
+        for _ in range(100):
+            if backend.cancelled:
+                break
+            time.sleep(0.01)
+        assert backend.cancelled == 1
+
+    def test_deadline(self):
+        """Test that a call with only slow attempts times out at its deadline."""
+        backend = HeavyTailBackend([1.0])
+        caller = HedgedCaller(deadline=0.2, initial_hedge_delay=0.05)
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            caller.call(backend)
+
+        assert time.monotonic() - start < 0.5
+        assert caller.stats()["timeouts"] == 1
+
+    def test_failed_attempt_is_retried_once(self):
+        """Test that an error from the first attempt triggers the hedge immediately."""
+        caller = HedgedCaller(deadline=1.0, initial_hedge_delay=0.5)
+
+        assert caller.call(FailingBackend(1)) == "ok"
+        with pytest.raises(ConnectionError):
+            caller.call(FailingBackend(2))
+        assert caller.stats()["errors"] == 1
+
+    def test_attempt_cancelled_behind_gate_is_not_sent(self):
+        """Test that a hedge waiting on the gate is not sent once the first attempt has answered."""
+        backend = HeavyTailBackend([0.2])
+        caller = HedgedCaller(deadline=2.0, initial_hedge_delay=0.05)
+        one_at_a_time = threading.Lock()
+
+        class Gate:
+            def __init__(self, cancel, seconds_left):
+                pass
+
+            def __enter__(self):
+                one_at_a_time.acquire()
+
+            def __exit__(self, *exc_info):
+                one_at_a_time.release()
+
+        assert caller.call(backend, gate=Gate) == 0.2
+        assert caller.stats()["hedged"] == 1
+        time.sleep(0.1)
+        assert backend.calls == 1
+
+    def test_gate_wait_is_not_latency(self):
+        """Test that time queued at the gate neither triggers a hedge nor counts as latency."""
+        backend = HeavyTailBackend([0.05])
+        caller = HedgedCaller(deadline=2.0, min_samples=1, initial_hedge_delay=0.1)
+
+        class QueuedGate:
+            def __init__(self, cancel, seconds_left):
+                pass
+
+            def __enter__(self):
+                time.sleep(0.3)
+
+            def __exit__(self, *exc_info):
+                pass
+
+        assert caller.call(backend, gate=QueuedGate) == 0.05
+        assert caller.stats()["hedged"] == 0
+        assert backend.calls == 1
+        assert caller.hedge_delay() < 0.2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
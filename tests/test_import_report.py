@@ -0,0 +1,80 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.import_report import (
+    COLD_START_BUDGET_MS,
+    DEFERRED_MODULES,
+    PER_RERUN_IMPORT_BUDGET,
+    REPO_ROOT,
+    SCRIPTS,
+    imported_modules,
+    measure_script,
+    parse_importtime,
+    summarize,
+    total_ms,
+)
+
+SAMPLE_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | encodings
+2026-01-01 00:00:00.000 WARNING streamlit: missing ScriptRunContext!
+import time:      1500 |       1500 |     streamlit.logger
+import time:      2500 |       4000 |   streamlit
+"""
+
+
+class TestParseImporttime:
+    """Test cases for parse_importtime() and its summaries."""
+
+    def test_parses_entries_and_skips_other_lines(self):
+        """Test that import lines are parsed and log lines ignored."""
+        entries = parse_importtime(SAMPLE_OUTPUT)
+
+        assert entries == [
+            ("_io", 120, 120, 1),
+            ("encodings", 300, 420, 0),
+            ("streamlit.logger", 1500, 1500, 2),
+            ("streamlit", 2500, 4000, 1),
+        ]
+
+    def test_summaries(self):
+        """Test totals and per-package grouping."""
+        entries = parse_importtime(SAMPLE_OUTPUT)
+
+        assert total_ms(entries) == pytest.approx(4.42)
+        assert list(summarize(entries).items())[0] == ("streamlit", 4.0)
+        assert "streamlit.logger" in imported_modules(entries)
+
+
+class TestImportBudgets:
+    """Regression tests for cold-start and per-rerun import cost."""
+
+    @pytest.mark.parametrize("script", SCRIPTS)
+    def test_cold_start(self, script):
+        """Test that heavy dependencies are deferred and startup stays in budget."""
+        entries = measure_script(script)
+
+        loaded = imported_modules(entries)
+        assert not [module for module in DEFERRED_MODULES if module in loaded]
+        assert total_ms(entries) < COLD_START_BUDGET_MS
+
+    @pytest.mark.parametrize("script", SCRIPTS)
+    def test_rerun_imports(self, script, tmp_path, monkeypatch):
+        """Test that rerunning a script does not import new modules."""
+        from streamlit.testing.v1 import AppTest
+
+        monkeypatch.chdir(tmp_path)
+        app = AppTest.from_file(os.path.join(REPO_ROOT, script)).run()
+        before = set(sys.modules)
+        app.run()
+
+        assert not app.exception
+        assert len(set(sys.modules) - before) <= PER_RERUN_IMPORT_BUDGET
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
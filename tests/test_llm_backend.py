@@ -0,0 +1,236 @@
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_backend import (
+    FAKE_EVALUATION,
+    BackendCancelled,
+    BackendConfigError,
+    BackendRateLimited,
+    FailoverBackend,
+    FakeBackend,
+    OpenAICompatibleBackend,
+    load_backend,
+)
+
+TRANSLATION_MESSAGES = [
+    {"role": "system", "content": "Translate to English."},
+    {"role": "user", "content": "Bonjour.\nMerci."},
+]
+
+
+class ChatHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions endpoint."""
+
+    status = 200
+    requests = []
+    # Seconds between streamed chunks, to simulate a slow generation
+    chunk_delay = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        ChatHandler.requests.append((self.path, self.headers.get("Authorization"), body))
+        if ChatHandler.status != 200:
+            self.send_response(ChatHandler.status)
+            self.end_headers()
+            return
+
+        content = body["messages"][-1]["content"].upper()
+        self.send_response(200)
+        if body["stream"]:
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            pieces = [content[:4], content[4:]] if not ChatHandler.chunk_delay else list(content)
+            try:
+                for piece in pieces:
+                    event = {"choices": [{"delta": {"content": piece}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(ChatHandler.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                ChatHandler.requests.append(("disconnected", None, None))
+        else:
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            response = {"choices": [{"message": {"role": "assistant", "content": content}}]}
+            self.wfile.write(json.dumps(response).encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(ChatHandler, "status", 200)
+    monkeypatch.setattr(ChatHandler, "requests", [])
+    monkeypatch.setattr(ChatHandler, "chunk_delay", 0.0)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ChatHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestOpenAICompatibleBackend:
+    """Test cases for OpenAICompatibleBackend against a local server."""
+
+    def test_complete(self, server):
+        """Test a plain completion request."""
+        backend = OpenAICompatibleBackend(server, model="local-model", api_key="secret")
+
+        assert backend.complete(TRANSLATION_MESSAGES, timeout=5) == "BONJOUR.\nMERCI."
+        path, authorization, body = ChatHandler.requests[0]
+        assert path == "/v1/chat/completions"
+        assert authorization == "Bearer secret"
+        assert body["model"] == "local-model"
+
+    def test_stream(self, server):
+        """Test that server-sent events are yielded as they arrive."""
+        backend = OpenAICompatibleBackend(server)
+
+        assert list(backend.stream(TRANSLATION_MESSAGES, timeout=5)) == ["BONJ", "OUR.\nMERCI."]
+
+    def test_cancel_stops_reading(self, server):
+        """Test that setting the cancel event abandons a slow response and its connection."""
+        ChatHandler.chunk_delay = 0.05
+        backend = OpenAICompatibleBackend(server)
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+
+        start = time.monotonic()
+        with pytest.raises(BackendCancelled):
+            backend.complete([{"role": "user", "content": "x" * 60}], timeout=5, cancel=cancel)
+
+        assert time.monotonic() - start < 1.0
+        for _ in range(100):
+            if ("disconnected", None, None) in ChatHandler.requests:
+                break
+            time.sleep(0.02)
+        assert ("disconnected", None, None) in ChatHandler.requests
+
+    def test_complete_with_cancel_event(self, server):
+        """Test that an unset cancel event does not change the answer."""
+        backend = OpenAICompatibleBackend(server)
+
+        assert backend.complete(TRANSLATION_MESSAGES, timeout=5, cancel=threading.Event()) == "BONJOUR.\nMERCI."
+
+    def test_batch_keeps_order(self, server):
+        """Test that batched requests come back in request order."""
+        backend = OpenAICompatibleBackend(server)
+        requests = [[{"role": "user", "content": f"phrase {i}"}] for i in range(6)]
+
+        assert backend.complete_batch(requests, timeout=5) == [f"PHRASE {i}" for i in range(6)]
+
+    def test_rate_limit(self, server):
+        """Test that HTTP 429 is reported as BackendRateLimited."""
+        ChatHandler.status = 429
+        with pytest.raises(BackendRateLimited):
+            OpenAICompatibleBackend(server).complete(TRANSLATION_MESSAGES, timeout=5)
+
+
+class TestFakeBackend:
+    """Test cases for the deterministic FakeBackend."""
+
+    def test_translation_and_evaluation(self):
+        """Test the canned translation and evaluation responses."""
+        backend = FakeBackend()
+        evaluation = [{"role": "system", "content": "French language evaluation assistant"}]
+
+        assert backend.complete(TRANSLATION_MESSAGES) == "In English: Bonjour.\nIn English: Merci."
+        assert json.loads(backend.complete(evaluation)) == FAKE_EVALUATION
+        assert "".join(backend.stream(TRANSLATION_MESSAGES)) == backend.complete(TRANSLATION_MESSAGES)
+        assert len(backend.complete_batch([TRANSLATION_MESSAGES, evaluation])) == 2
+        assert len(backend.calls) == 6
+
+    def test_timeout(self):
+        """Test that a latency above the timeout raises TimeoutError."""
+        with pytest.raises(TimeoutError):
+            FakeBackend(latency=0.2).complete(TRANSLATION_MESSAGES, timeout=0.01)
+
+    def test_cancel(self):
+        """Test that setting the cancel event cuts the simulated latency short."""
+        cancel = threading.Event()
+        threading.Timer(0.05, cancel.set).start()
+
+        start = time.monotonic()
+        with pytest.raises(BackendCancelled):
+            FakeBackend(latency=2.0).complete(TRANSLATION_MESSAGES, cancel=cancel)
+        assert time.monotonic() - start < 1.0
+
+
+class RateLimitedBackend(FakeBackend):
+    """Fake backend whose quota is exhausted."""
+
+    name = "limited"
+
+    def complete(self, messages, temperature=0.3, timeout=None, cancel=None):
+        raise BackendRateLimited("quota exceeded")
+
+    def stream(self, messages, temperature=0.3, timeout=None, cancel=None):
+        raise BackendRateLimited("quota exceeded")
+        yield
+
+
+class TestFailoverBackend:
+    """Test cases for FailoverBackend."""
+
+    def test_fails_over_when_rate_limited(self):
+        """Test that rate-limited requests are served by the fallback."""
+        fallback = FakeBackend()
+        backend = FailoverBackend(RateLimitedBackend(), fallback)
+
+        assert backend.complete(TRANSLATION_MESSAGES).startswith("In English:")
+        assert "".join(backend.stream(TRANSLATION_MESSAGES)).startswith("In English:")
+        assert backend.failovers == 2
+        assert backend.name == "limited+fake"
+
+    def test_other_errors_are_not_retried(self):
+        """Test that only rate limiting triggers failover."""
+        failing = FakeBackend(responder=lambda messages: 1 / 0)
+        backend = FailoverBackend(failing, FakeBackend())
+
+        with pytest.raises(ZeroDivisionError):
+            backend.complete(TRANSLATION_MESSAGES)
+
+
+class TestLoadBackend:
+    """Test cases for selecting a backend from configuration."""
+
+    def test_selects_backend(self):
+        """Test that LLM_BACKEND picks the implementation."""
+        assert isinstance(load_backend({"LLM_BACKEND": "fake"}), FakeBackend)
+        backend = load_backend({"LLM_BACKEND": "openai", "LLM_BASE_URL": "http://localhost:8000/v1"})
+        assert isinstance(backend, OpenAICompatibleBackend)
+        assert backend.url == "http://localhost:8000/v1/chat/completions"
+
+    def test_fallback(self):
+        """Test that LLM_FALLBACK_BACKEND wraps the primary backend."""
+        backend = load_backend({
+            "LLM_BACKEND": "openai",
+            "LLM_BASE_URL": "http://localhost:8000/v1",
+            "LLM_FALLBACK_BACKEND": "fake",
+        })
+        assert isinstance(backend, FailoverBackend)
+        assert isinstance(backend.fallback, FakeBackend)
+
+    def test_missing_settings(self):
+        """Test that incomplete or unknown configuration is rejected."""
+        with pytest.raises(BackendConfigError):
+            load_backend({"LLM_BACKEND": "groq"})
+        with pytest.raises(BackendConfigError):
+            load_backend({"LLM_BACKEND": "openai"})
+        with pytest.raises(BackendConfigError):
+            load_backend({"LLM_BACKEND": "carrier-pigeon"})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
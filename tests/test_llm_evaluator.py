@@ -3,7 +3,12 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.llm_evaluator import extract_json
+import threading
+import time
+
+from utils.hedging import HedgedCaller
+from utils.llm_evaluator import evaluate_translation, extract_json
+from utils.scheduler import INTERACTIVE, RequestScheduler
 
 
 class TestExtractJson:
@@ -115,6 +120,135 @@ Hope this helps!'''
         assert "corrected_version" in parsed
 
 
+
+class SlowBackend:
+    """Fake LLM backend that answers after a delay."""
+
+    name = "slow"
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.timeouts = []
+
+    def complete(self, messages, temperature=0.3, timeout=None, cancel=None):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return '{"overall_score": 88, "feedback": "Bien !"}'
+
+
+class StallingBackend:
+    """Fake LLM backend whose first request stalls until it is cancelled."""
+
+    name = "stalling"
+
+    def __init__(self, on_call=None):
+        self.calls = 0
+        self.cancelled = threading.Event()
+        self.on_call = on_call
+        self._lock = threading.Lock()
+
+    def complete(self, messages, temperature=0.3, timeout=None, cancel=None):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if self.on_call:
+            self.on_call()
+        if first:
+            if cancel is not None and cancel.wait(timeout):
+                self.cancelled.set()
+                raise RuntimeError("cancelled")
+            raise TimeoutError("stalled")
+        return '{"overall_score": 91, "feedback": "Très bien !"}'
+
+
+class TestEvaluateTranslation:
+    """Test cases for evaluate_translation() deadlines."""
+
+    def test_returns_result_within_deadline(self):
+        """Test that a timely answer is parsed and the backend gets a timeout."""
+        backend = SlowBackend(0.01)
+        result = evaluate_translation("Bonjour.", "Hello.", "Bonjour.", backend, HedgedCaller(deadline=1.0))
+
+        assert result["overall_score"] == 88
+        assert "error" not in result
+        assert 0 < backend.timeouts[0] <= 1.0
+
+    def test_hedge_cancels_stalled_request(self):
+        """Test that the stalled request is cancelled once the hedge answers."""
+        backend = StallingBackend()
+        caller = HedgedCaller(deadline=2.0, initial_hedge_delay=0.05)
+
+        result = evaluate_translation("Bonjour.", "Hello.", "Bonjour.", backend, caller)
+
+        assert result["overall_score"] == 91
+        assert backend.cancelled.wait(1.0)
+
+    def test_each_attempt_holds_a_slot(self):
+        """Test that the hedge takes its own scheduler slot rather than sharing the first."""
+        scheduler = RequestScheduler(max_concurrent=2)
+        in_flight = []
+        backend = StallingBackend(on_call=lambda: in_flight.append(scheduler.stats()["in_flight"]))
+        caller = HedgedCaller(deadline=2.0, initial_hedge_delay=0.05)
+
+        result = evaluate_translation("Bonjour.", "Hello.", "Bonjour.", backend, caller, scheduler)
+
+        assert result["overall_score"] == 91
+        assert in_flight == [1, 2]
+        assert scheduler.stats()["classes"]["interactive"]["admitted"] == 2
+
+    def test_cancelled_hedge_is_not_sent(self):
+        """Test that a hedge still queued for a slot when the first attempt answers is never sent."""
+        scheduler = RequestScheduler(max_concurrent=1)
+        backend = SlowBackend(0.2)
+        caller = HedgedCaller(deadline=2.0, initial_hedge_delay=0.05)
+
+        result = evaluate_translation("Bonjour.", "Hello.", "Bonjour.", backend, caller, scheduler)
+
+        assert result["overall_score"] == 88
+        for _ in range(100):
+            if scheduler.stats()["classes"]["interactive"]["cancelled"]:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        stats = scheduler.stats()
+        assert stats["classes"]["interactive"]["cancelled"] == 1
+        assert stats["queue_depth"] == 0
+        assert len(backend.timeouts) == 1
+
+    def test_slot_wait_is_bounded_by_deadline(self):
+        """Test that waiting for a busy scheduler gives up at the evaluation deadline."""
+        scheduler = RequestScheduler(max_concurrent=1)
+        scheduler.acquire(INTERACTIVE, "someone else")
+        backend = SlowBackend(0.01)
+        caller = HedgedCaller(deadline=0.2, initial_hedge_delay=0.05)
+
+        start = time.monotonic()
+        result = evaluate_translation("Bonjour.", "Hello.", "Salut.", backend, caller, scheduler)
+
+        assert time.monotonic() - start < 0.5
+        assert "too long" in result["feedback"]
+        for _ in range(100):
+            if scheduler.stats()["queue_depth"] == 0:
+                break
+            time.sleep(0.01)
+        assert scheduler.stats()["queue_depth"] == 0
+        assert backend.timeouts == []
+
+    def test_times_out(self):
+        """Test that a stalled evaluation returns a timeout result."""
+        backend = SlowBackend(0.5)
+        caller = HedgedCaller(deadline=0.1, initial_hedge_delay=0.05)
+
+        start = time.monotonic()
+        result = evaluate_translation("Bonjour.", "Hello.", "Salut.", backend, caller)
+
+        assert time.monotonic() - start < 0.4
+        assert result["error"] == "timeout"
+        assert result["overall_score"] == 0
+        assert "too long" in result["feedback"]
+        assert result["corrected_version"] == "Salut."
+
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__, "-v"])
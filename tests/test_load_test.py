@@ -0,0 +1,44 @@
+import sys
+import os
+import math
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.load_test import format_report, percentile, run_load_test
+
+
+class TestPercentile:
+    """Test cases for percentile() function."""
+
+    def test_nearest_rank(self):
+        """Test nearest-rank percentiles."""
+        values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+        assert percentile(values, 50) == 3.0
+        assert percentile(values, 90) == 5.0
+        assert percentile(values, 0) == 1.0
+        assert percentile([7.0], 99) == 7.0
+
+
+class TestRunLoadTest:
+    """End-to-end run of the offline load test."""
+
+    def test_small_run(self):
+        """Test that two learners complete their loops and are reported."""
+        report = run_load_test(users=2, iterations=2)
+
+        latency = report["latency_ms"]
+        assert latency["process_video"]["count"] == 1
+        assert latency["page_load"]["count"] == 2
+        assert latency["check"]["count"] == 4
+        assert latency["next"]["count"] == 4
+        assert report["reruns"] == 2 * (2 + 3 * 2)
+        assert report["reruns_per_s"] > 0
+        # A difference of two RSS readings: it can be slightly negative
+        assert math.isfinite(report["rss_per_session_mib"])
+        assert "check" in format_report(report)
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,61 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+import utils.llm_evaluator as llm_evaluator
+from tools.load_test import FAKE_TRANSCRIPT, PRACTICE_SCRIPT, offline_environment
+from utils.hedging import HedgedCaller
+from utils.llm_backend import FakeBackend
+
+
+def load_practice_page() -> AppTest:
+    with open("french_transcript.txt", "w", encoding="utf-8") as f:
+        f.write(" ".join(FAKE_TRANSCRIPT))
+    with open("english_transcript.txt", "w", encoding="utf-8") as f:
+        f.write(" ".join(f"Sentence {i}." for i in range(len(FAKE_TRANSCRIPT))))
+
+    app = AppTest.from_file(PRACTICE_SCRIPT, default_timeout=30).run()
+    next(b for b in app.button if b.label == "Load Transcripts").click()
+    return app.run()
+
+
+class TestCheckTranslation:
+    """Test cases for the Check Translation flow of the practice page."""
+
+    def test_timeout_is_not_graded(self, tmp_path, monkeypatch):
+        """Test that a timed-out evaluation shows an error and leaves the answer submittable."""
+        monkeypatch.setattr(llm_evaluator, "_evaluation_caller", HedgedCaller(deadline=0.1))
+
+        with offline_environment(str(tmp_path), backend=FakeBackend(latency=1.0)):
+            app = load_practice_page()
+            app.text_area[0].input("Bonjour à tous.")
+            app.run()
+            next(b for b in app.button if b.label == "Check Translation").click()
+            app.run()
+
+            assert not app.exception
+            assert any("too long" in e.value for e in app.error)
+            assert not app.session_state["show_result"]
+            assert app.session_state["session_stats"]["sentences_completed"] == 0
+            assert not next(b for b in app.button if b.label == "Check Translation").disabled
+
+    def test_graded_answer(self, tmp_path):
+        """Test that a successful evaluation is shown and counted."""
+        with offline_environment(str(tmp_path)):
+            app = load_practice_page()
+            app.text_area[0].input("Bonjour à tous.")
+            app.run()
+            next(b for b in app.button if b.label == "Check Translation").click()
+            app.run()
+
+            assert not app.exception
+            assert app.session_state["show_result"]
+            assert app.session_state["session_stats"]["sentences_completed"] == 1
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,178 @@
+import sys
+import os
+import pstats
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+import utils.profiler as profiler_module
+from tools.load_test import APP_SCRIPT, FAKE_VIDEO_URL, PRACTICE_SCRIPT, find_button, offline_environment
+from utils.profiler import Profiler
+
+
+def work(profiler, seconds):
+    @profiler.timed("inner")
+    def inner():
+        time.sleep(seconds)
+
+    with profiler.span("outer"):
+        inner()
+        inner()
+
+
+class TestProfiler:
+    """Test cases for Profiler."""
+
+    def test_disabled_is_a_no_op(self):
+        """Test that a disabled profiler leaves functions untouched and records nothing."""
+        profiler = Profiler(enabled=False)
+
+        def fn():
+            return 42
+
+        assert profiler.timed()(fn) is fn
+        assert profiler.span("a") is profiler.span("b")
+        profiler.begin_rerun("page")
+        with profiler.span("a"):
+            pass
+        profiler.end_rerun()
+        assert profiler.recent() == []
+
+    def test_nested_spans(self):
+        """Test that spans are recorded with their call path."""
+        profiler = Profiler(enabled=True)
+        profiler.begin_rerun("page")
+        work(profiler, 0.01)
+        profiler.end_rerun()
+
+        rerun = profiler.recent()[0]
+        assert [span.path for span in rerun.spans] == [
+            ("page", "outer", "inner"), ("page", "outer", "inner"), ("page", "outer")
+        ]
+        assert rerun.duration_ms >= rerun.spans[-1].duration_ms >= 20
+        summary = profiler.summary()
+        assert summary["inner"]["calls"] == 2
+        assert summary["page"]["calls"] == 1
+
+    def test_collapsed_stacks(self):
+        """Test the flamegraph collapsed-stack output uses self times."""
+        profiler = Profiler(enabled=True)
+        profiler.begin_rerun("page")
+        work(profiler, 0.01)
+        profiler.end_rerun()
+
+        stacks = {}
+        for line in profiler.collapsed_stacks().splitlines():
+            path, microseconds = line.rsplit(" ", 1)
+            stacks[path] = int(microseconds)
+        assert stacks["page;outer;inner"] >= 20000
+        assert stacks.get("page;outer", 0) < stacks["page;outer;inner"]
+
+    def test_ring_buffer(self):
+        """Test that only the most recent reruns are kept."""
+        profiler = Profiler(enabled=True, ring_size=3)
+        for i in range(5):
+            profiler.begin_rerun(f"run{i}")
+            profiler.end_rerun()
+
+        assert [rerun.page for rerun in profiler.recent()] == ["run2", "run3", "run4"]
+
+    def test_interrupted_rerun(self):
+        """Test that a rerun never ended is closed when the next one begins."""
+        profiler = Profiler(enabled=True)
+        profiler.begin_rerun("first")
+        with profiler.span("step"):
+            pass
+        profiler.begin_rerun("second")
+        profiler.end_rerun()
+
+        first, second = profiler.recent()
+        assert first.interrupted and not second.interrupted
+        assert first.duration_ms == pytest.approx(first.spans[0].start_ms + first.spans[0].duration_ms)
+
+    def test_span_outside_rerun(self):
+        """Test that a span with no open rerun is recorded as its own run."""
+        profiler = Profiler(enabled=True)
+        with profiler.span("fragment"):
+            pass
+
+        assert [rerun.page for rerun in profiler.recent()] == ["fragment"]
+
+    def test_nested_spans_outside_rerun(self):
+        """Test that timed calls nested in a span with no open rerun are recorded inside its run."""
+        profiler = Profiler(enabled=True)
+
+        @profiler.timed("fragment")
+        def fragment():
+            work(profiler, 0.005)
+
+        fragment()
+        fragment()
+
+        reruns = profiler.recent()
+        assert [rerun.page for rerun in reruns] == ["fragment", "fragment"]
+        assert [span.path for span in reruns[0].spans] == [
+            ("fragment", "outer", "inner"), ("fragment", "outer", "inner"), ("fragment", "outer")
+        ]
+        assert reruns[0].duration_ms >= reruns[0].spans[-1].duration_ms >= 10
+
+    def test_spans_outside_rerun_in_threads(self):
+        """Test that concurrent threads outside a session each record their own run."""
+        profiler = Profiler(enabled=True)
+        threads = [threading.Thread(target=work, args=(profiler, 0.02)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reruns = profiler.recent()
+        assert [rerun.page for rerun in reruns] == ["outer"] * 3
+        assert all([span.path for span in rerun.spans] == [("outer", "inner")] * 2 for rerun in reruns)
+
+    def test_cprofile_dump(self, tmp_path):
+        """Test that cProfile output can be read back by pstats."""
+        profiler = Profiler(enabled=True, use_cprofile=True)
+        profiler.begin_rerun("page")
+        work(profiler, 0.001)
+        profiler.end_rerun()
+
+        path = str(tmp_path / "reruns.prof")
+        assert profiler.dump_cprofile(path)
+        functions = {name for _, _, name in pstats.Stats(path).stats}
+        assert "inner" in functions
+
+
+class TestProfilerPanel:
+    """Profiling the Streamlit pages end to end."""
+
+    def test_practice_page(self, tmp_path, monkeypatch):
+        """Test that page reruns are recorded and shown in the developer panel."""
+        profiler = Profiler(enabled=True)
+        monkeypatch.setattr(profiler_module, "_profiler", profiler)
+
+        with offline_environment(str(tmp_path)):
+            app = AppTest.from_file(APP_SCRIPT, default_timeout=30).run()
+            app.text_input[0].set_value(FAKE_VIDEO_URL)
+            find_button(app, "Process Video").click()
+            app.run()
+
+            page = AppTest.from_file(PRACTICE_SCRIPT, default_timeout=30).run()
+            find_button(page, "Load Transcripts").click()
+            page.run()
+            page.run()
+
+            assert not page.exception
+            pages = [rerun.page for rerun in profiler.recent()]
+            assert pages[:2] == ["app", "app"]
+            assert "practice" in pages
+            assert "load_transcripts" in profiler.summary()
+            assert any(expander.label == "Profiler" for expander in page.sidebar.expander)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,191 @@
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scheduler import BULK, INTERACTIVE, PREFETCH, RequestScheduler, SchedulerRejected
+
+
+def start_waiter(scheduler, priority, user_id, order, hold=0.0):
+    """Start a thread that takes a slot, records its turn and releases it."""
+    errors = []
+
+    def worker():
+        try:
+            with scheduler.slot(priority, user_id, timeout=5):
+                order.append((priority, user_id))
+                time.sleep(hold)
+        except SchedulerRejected as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    return thread, errors
+
+
+def wait_for_depth(scheduler, depth):
+    """Wait until `depth` requests are queued."""
+    for _ in range(500):
+        if scheduler.stats()["queue_depth"] == depth:
+            return
+        time.sleep(0.002)
+    raise AssertionError(f"queue never reached depth {depth}")
+
+
+class TestRequestScheduler:
+    """Test cases for RequestScheduler."""
+
+    def test_higher_priority_served_first(self):
+        """Test that queued interactive work jumps ahead of bulk work."""
+        scheduler = RequestScheduler(max_concurrent=1)
+        order = []
+        scheduler.acquire(BULK, "uploader")
+
+        threads = []
+        for priority, user_id in [(BULK, "uploader"), (PREFETCH, "b"), (INTERACTIVE, "a")]:
+            threads.append(start_waiter(scheduler, priority, user_id, order)[0])
+            wait_for_depth(scheduler, len(threads))
+
+        scheduler.release(BULK)
+        for thread in threads:
+            thread.join()
+
+        assert order == [(INTERACTIVE, "a"), (PREFETCH, "b"), (BULK, "uploader")]
+
+    def test_users_served_round_robin(self):
+        """Test that one user's backlog does not starve another user."""
+        scheduler = RequestScheduler(max_concurrent=1)
+        order = []
+        scheduler.acquire(BULK, "busy")
+
+        threads = []
+        for user_id in ["busy", "busy", "busy", "quiet"]:
+            threads.append(start_waiter(scheduler, BULK, user_id, order)[0])
+            wait_for_depth(scheduler, len(threads))
+
+        scheduler.release(BULK)
+        for thread in threads:
+            thread.join()
+
+        assert [user_id for _, user_id in order] == ["busy", "quiet", "busy", "busy"]
+
+    def test_rejects_when_class_queue_full(self):
+        """Test admission control on per-class queue depth."""
+        scheduler = RequestScheduler(max_concurrent=1, max_queue_depth={BULK: 1})
+        scheduler.acquire(BULK, "a")
+        thread, errors = start_waiter(scheduler, BULK, "a", [])
+        wait_for_depth(scheduler, 1)
+
+        with pytest.raises(SchedulerRejected):
+            scheduler.acquire(BULK, "b")
+
+        scheduler.release(BULK)
+        thread.join()
+        assert not errors
+        assert scheduler.stats()["classes"]["bulk"]["rejected"] == 1
+
+    def test_sheds_low_priority_under_load(self):
+        """Test that interactive requests displace queued bulk work when overloaded."""
+        scheduler = RequestScheduler(max_concurrent=1, shed_threshold=2)
+        scheduler.acquire(INTERACTIVE, "a")
+        order = []
+        bulk_threads = [start_waiter(scheduler, BULK, "uploader", order) for _ in range(2)]
+        wait_for_depth(scheduler, 2)
+
+        with pytest.raises(SchedulerRejected):
+            scheduler.acquire(PREFETCH, "b")
+
+        interactive, interactive_errors = start_waiter(scheduler, INTERACTIVE, "c", order)
+        wait_for_depth(scheduler, 2)
+        scheduler.release(INTERACTIVE)
+        for thread, _ in bulk_threads:
+            thread.join()
+        interactive.join()
+
+        shed = [e for _, errors in bulk_threads for e in errors]
+        assert len(shed) == 1
+        assert not interactive_errors
+        assert order[0] == (INTERACTIVE, "c")
+        stats = scheduler.stats()["classes"]
+        assert stats["bulk"]["shed"] == 1
+        assert stats["prefetch"]["rejected"] == 1
+
+    def test_reserves_slots_for_interactive(self):
+        """Test that bulk work cannot take the slot reserved for interactive requests."""
+        scheduler = RequestScheduler(max_concurrent=3, reserved_interactive=1)
+        scheduler.acquire(BULK, "uploader")
+        scheduler.acquire(BULK, "uploader")
+
+        with pytest.raises(SchedulerRejected):
+            scheduler.acquire(BULK, "uploader", timeout=0.05)
+        with pytest.raises(SchedulerRejected):
+            scheduler.acquire(PREFETCH, "a", timeout=0.05)
+        scheduler.acquire(INTERACTIVE, "a", timeout=0.05)
+
+        assert scheduler.stats()["in_flight"] == 3
+
+    def test_reservation_leaves_one_shared_slot(self):
+        """Test that bulk work can still run when the reservation covers every slot."""
+        scheduler = RequestScheduler(max_concurrent=1, reserved_interactive=2)
+
+        scheduler.acquire(BULK, "uploader", timeout=0.05)
+
+        assert scheduler.stats()["reserved_interactive"] == 0
+
+    def test_cancelled_request_leaves_queue(self):
+        """Test that setting the cancel event drops a waiting request."""
+        scheduler = RequestScheduler(max_concurrent=1)
+        scheduler.acquire(INTERACTIVE, "a")
+        cancel = threading.Event()
+        errors = []
+
+        def waiter():
+            try:
+                scheduler.acquire(INTERACTIVE, "b", cancel=cancel)
+            except SchedulerRejected as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        wait_for_depth(scheduler, 1)
+        cancel.set()
+        thread.join(timeout=1)
+
+        assert len(errors) == 1
+        assert scheduler.stats()["queue_depth"] == 0
+        scheduler.release(INTERACTIVE)
+        stats = scheduler.stats()
+        assert stats["in_flight"] == 0
+        assert stats["classes"]["interactive"]["cancelled"] == 1
+        with pytest.raises(SchedulerRejected):
+            scheduler.acquire(INTERACTIVE, "c", cancel=cancel)
+
+    def test_timeout(self):
+        """Test that a request gives up after its timeout."""
+        scheduler = RequestScheduler(max_concurrent=1)
+        scheduler.acquire(BULK, "a")
+
+        with pytest.raises(SchedulerRejected):
+            scheduler.acquire(BULK, "b", timeout=0.05)
+
+        assert scheduler.stats()["queue_depth"] == 0
+
+    def test_stats(self):
+        """Test queue depth and wait time reporting."""
+        scheduler = RequestScheduler(max_concurrent=2)
+        assert scheduler.run(INTERACTIVE, "a", lambda x: x * 2, 21) == 42
+
+        stats = scheduler.stats()
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+        assert stats["classes"]["interactive"]["admitted"] == 1
+        assert stats["classes"]["interactive"]["completed"] == 1
+        assert stats["classes"]["interactive"]["wait_max_ms"] >= 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,141 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.translation_memory import TranslationMemory, normalize_sentence
+
+
+class TestNormalizeSentence:
+    """Test cases for normalize_sentence() function."""
+
+    def test_ignores_case_punctuation_and_spacing(self):
+        """Test that formatting differences share one key."""
+        assert normalize_sentence("Merci d’avoir regardé cette vidéo !") == \
+            normalize_sentence("merci d'avoir  regardé cette vidéo.")
+
+    def test_keeps_question_mark(self):
+        """Test that a question does not share its key with the statement."""
+        assert normalize_sentence("Tu viens demain ?") == "tu viens demain ?"
+        assert normalize_sentence("« Tu viens demain ? »") == "tu viens demain ?"
+        assert normalize_sentence("Tu viens demain ?") != normalize_sentence("Tu viens demain.")
+
+    def test_keeps_accents(self):
+        """Test that accents still distinguish words."""
+        assert normalize_sentence("où") != normalize_sentence("ou")
+
+
+class TestTranslationMemory:
+    """Test cases for TranslationMemory lookups and persistence."""
+
+    def test_exact_match(self):
+        """Test that an identical sentence is found with similarity 1.0."""
+        memory = TranslationMemory()
+        memory.add("Merci d'avoir regardé cette vidéo.", "Thanks for watching this video.")
+
+        assert memory.lookup("Merci d'avoir regardé cette vidéo !") == \
+            ("Thanks for watching this video.", 1.0)
+
+    def test_near_duplicate_match(self):
+        """Test that a sentence with a small spelling variation is matched."""
+        memory = TranslationMemory()
+        memory.add(
+            "N'oubliez pas de vous abonner à la chaîne et d'activer la cloche.",
+            "Don't forget to subscribe to the channel and turn on the bell."
+        )
+        memory.add("Je vais au marché demain.", "I'm going to the market tomorrow.")
+
+        english, similarity = memory.lookup(
+            "N'oubliez pas de vous abonner à la chaine et d'activer la cloche."
+        )
+
+        assert english == "Don't forget to subscribe to the channel and turn on the bell."
+        assert 0.9 <= similarity < 1.0
+
+    def test_different_sentence_misses(self):
+        """Test that unrelated or only loosely similar sentences are not matched."""
+        memory = TranslationMemory()
+        memory.add("Merci d'avoir regardé cette vidéo.", "Thanks for watching this video.")
+
+        assert memory.lookup("Merci d'avoir lu cet article.") is None
+        assert memory.lookup("Bonjour à tous.") is None
+        assert memory.lookup("") is None
+
+    def test_negation_is_not_reused(self):
+        """Test that adding a negation prevents a fuzzy match despite high similarity."""
+        memory = TranslationMemory()
+        memory.add(
+            "Je pense que nous devrions absolument partir demain matin avec toute la famille.",
+            "I think we should absolutely leave tomorrow morning with the whole family."
+        )
+
+        assert memory.lookup(
+            "Je ne pense pas que nous devrions absolument partir demain matin avec toute la famille."
+        ) is None
+        assert memory.lookup(
+            "Je pense que nous ne devrions jamais partir demain matin avec toute la famille."
+        ) is None
+
+    def test_number_change_is_not_reused(self):
+        """Test that sentences differing only by a number are not matched."""
+        memory = TranslationMemory(threshold=0.8)
+        memory.add(
+            "Il y a 20 personnes dans la salle de classe ce matin.",
+            "There are 20 people in the classroom this morning."
+        )
+
+        assert memory.lookup("Il y a 25 personnes dans la salle de classe ce matin.") is None
+        assert memory.lookup("Il y a trois personnes dans la salle de classe ce matin.") is None
+
+    def test_question_is_not_reused_for_statement(self):
+        """Test that a question and the matching statement never match each other."""
+        memory = TranslationMemory(threshold=0.5)
+        memory.add("Tu viens demain.", "You are coming tomorrow.")
+        memory.add("Est-ce que vous avez déjà visité le musée du Louvre à Paris ?",
+                   "Have you ever visited the Louvre museum in Paris?")
+
+        assert memory.lookup("Tu viens demain ?") is None
+        assert memory.lookup("Tu viens demain !") == ("You are coming tomorrow.", 1.0)
+        assert memory.lookup("Est-ce que vous avez déjà visité le musée du Louvre à Paris.") is None
+        assert memory.lookup("Est-ce que vous avez deja visité le musée du Louvre à Paris ?") is not None
+
+    def test_threshold_is_configurable(self):
+        """Test that a lower threshold accepts looser matches."""
+        memory = TranslationMemory(threshold=0.5)
+        memory.add("Merci d'avoir regardé cette vidéo.", "Thanks for watching this video.")
+
+        assert memory.lookup("Merci d'avoir regardé ma vidéo.") is not None
+
+    def test_add_replaces_same_key(self):
+        """Test that re-adding a sentence updates its translation."""
+        memory = TranslationMemory()
+        memory.add("Bonjour.", "Hello.")
+        memory.add("bonjour", "Good morning.")
+
+        assert len(memory) == 1
+        assert memory.lookup("Bonjour !")[0] == "Good morning."
+
+    def test_save_and_load(self, tmp_path):
+        """Test that entries survive a save/load round trip."""
+        path = str(tmp_path / "translation_memory.json")
+        memory = TranslationMemory(path)
+        memory.add("À bientôt.", "See you soon.")
+        memory.add("Salut tout le monde.", "Hi everyone.")
+        memory.save()
+
+        loaded = TranslationMemory.load(path)
+
+        assert len(loaded) == 2
+        assert loaded.lookup("à bientôt")[0] == "See you soon."
+
+    def test_load_missing_file(self, tmp_path):
+        """Test that a missing file gives an empty memory."""
+        memory = TranslationMemory.load(str(tmp_path / "missing.json"))
+
+        assert len(memory) == 0
+        assert memory.lookup("Bonjour.") is None
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""
+Export, import and benchmark video catalog snapshots.
+
+Export compacts the local catalog (one block per processed video, later
+reprocessing appended) into a snapshot with large blocks. Import verifies a
+snapshot in one streaming pass and merges it into the local catalog, so a
+fresh node can be warmed without reprocessing videos.
+
+Usage:
+    python -m tools.catalog_snapshot export snapshot.bin
+    python -m tools.catalog_snapshot import snapshot.bin
+    python -m tools.catalog_snapshot bench --videos 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCH_SENTENCES_PER_VIDEO = 40
+
+
+def export_catalog(catalog_path: str, snapshot_path: str) -> int:
+    """Write the latest record of every catalog video to a compact snapshot."""
+    from utils.catalog import load_catalog, write_snapshot
+
+    records = load_catalog(catalog_path, skip_torn_tail=True)
+    write_snapshot(snapshot_path, records.values())
+    return len(records)
+
+
+def import_snapshot(snapshot_path: str, catalog_path: str) -> int:
+    """
+    Merge a snapshot into the local catalog; snapshot records win.
+
+    The snapshot is fully verified before the catalog is replaced, so a
+    corrupted snapshot leaves the local catalog untouched. The merge holds
+    the catalog's write lock, so videos appended meanwhile are kept.
+    """
+    from utils.catalog import catalog_lock, load_catalog, write_snapshot
+
+    imported = load_catalog(snapshot_path)
+    with catalog_lock(catalog_path):
+        records = load_catalog(catalog_path, skip_torn_tail=True) if os.path.exists(catalog_path) else {}
+        records.update(imported)
+        write_snapshot(catalog_path, records.values())
+    return len(imported)
+
+
+def synthetic_records(videos: int, sentences: int, seed: int = 0) -> Iterator[Any]:
+    """Generate catalog records with realistic sentence lengths and vocabulary."""
+    import numpy as np
+    from utils.catalog import VideoRecord, audio_key
+    from utils.difficulty import FEATURE_NAMES, get_frequency_ranks
+
+    rng = random.Random(seed)
+    words = list(get_frequency_ranks())
+    for v in range(videos):
+        french = [
+            " ".join(rng.choices(words, k=rng.randint(5, 20))).capitalize() + "."
+            for _ in range(sentences)
+        ]
+        yield VideoRecord(
+            video_id=f"video{v:07d}",
+            french=french,
+            english=[f"Sentence {i} of video {v}, translated." for i in range(sentences)],
+            starts=np.arange(sentences, dtype=np.float32) * 4.0,
+            features={name: np.full(sentences, rng.random(), dtype=np.float32) for name in FEATURE_NAMES},
+            audio_keys=[audio_key(text) for text in french],
+        )
+
+
+def run_benchmark(videos: int, sentences: int = BENCH_SENTENCES_PER_VIDEO) -> Dict[str, Any]:
+    """Write a synthetic snapshot of `videos` videos and time a full load."""
+    from utils.catalog import iter_snapshot, load_catalog, write_snapshot
+
+    with tempfile.TemporaryDirectory(prefix="catalog-bench-") as workdir:
+        path = os.path.join(workdir, "snapshot.bin")
+        records = list(synthetic_records(videos, sentences))
+        text_bytes = sum(
+            len(s.encode("utf-8")) for record in records for s in record.french + record.english
+        )
+
+        start = time.perf_counter()
+        write_snapshot(path, records)
+        write_s = time.perf_counter() - start
+        size = os.path.getsize(path)
+        del records
+
+        start = time.perf_counter()
+        streamed = sum(1 for _ in iter_snapshot(path))
+        stream_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        catalog = load_catalog(path)
+        load_s = time.perf_counter() - start
+
+    return {
+        "videos": len(catalog),
+        "sentences": videos * sentences,
+        "streamed_videos": streamed,
+        "snapshot_mib": size / 2**20,
+        "text_mib": text_bytes / 2**20,
+        "bytes_per_sentence": size / max(videos * sentences, 1),
+        "write_s": write_s,
+        "stream_s": stream_s,
+        "load_s": load_s,
+        "load_mib_per_s": size / 2**20 / load_s if load_s else 0.0,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a benchmark report as text."""
+    return "\n".join([
+        f"{report['videos']} videos, {report['sentences']} sentence pairs",
+        f"snapshot        {report['snapshot_mib']:.1f} MiB "
+        f"({report['bytes_per_sentence']:.0f} bytes per pair, {report['text_mib']:.1f} MiB of raw text)",
+        f"write           {report['write_s']:.2f} s",
+        f"stream          {report['stream_s']:.2f} s",
+        f"load            {report['load_s']:.2f} s ({report['load_mib_per_s']:.1f} MiB/s)",
+    ])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalog", default="video_catalog.bin", help="local catalog path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write the local catalog to a snapshot")
+    export.add_argument("snapshot")
+    restore = commands.add_parser("import", help="merge a snapshot into the local catalog")
+    restore.add_argument("snapshot")
+    bench = commands.add_parser("bench", help="time loading a synthetic snapshot")
+    bench.add_argument("--videos", type=int, default=10000)
+    bench.add_argument("--sentences", type=int, default=BENCH_SENTENCES_PER_VIDEO, help="sentence pairs per video")
+    bench.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    if args.command == "export":
+        count = export_catalog(args.catalog, args.snapshot)
+        print(f"Exported {count} videos to {args.snapshot}")
+    elif args.command == "import":
+        count = import_snapshot(args.snapshot, args.catalog)
+        print(f"Imported {count} videos into {args.catalog}")
+    else:
+        report = run_benchmark(args.videos, args.sentences)
+        print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
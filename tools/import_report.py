@@ -0,0 +1,125 @@
+"""
+Import-time report for the Streamlit scripts.
+
+Runs a script in a fresh interpreter with ``-X importtime`` and summarizes
+where cold-start time goes, grouped by top-level package.
+
+Usage:
+    python -m tools.import_report app.py pages/1_Writing_Practice.py --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = ("app.py", "pages/1_Writing_Practice.py")
+
+# Total import time allowed when a script starts in a fresh process
+COLD_START_BUDGET_MS = 2500
+
+# Modules a script may import during a rerun (reruns should reuse sys.modules)
+PER_RERUN_IMPORT_BUDGET = 0
+
+# Dependencies that must only be imported when a feature actually needs them
+DEFERRED_MODULES = ("groq", "gtts", "youtube_transcript_api", "numpy")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+# Executes the script the way `streamlit run` would, minus the server
+RUNNER = (
+    "import runpy, sys; "
+    "sys.path.insert(0, {root!r}); "
+    "runpy.run_path({script!r}, run_name='__main__')"
+)
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth) tuples in the order
+        they were reported; other lines are ignored
+    """
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure_script(script: str) -> List[Tuple[str, int, int, int]]:
+    """Run a repo script with ``-X importtime`` and return its parsed imports."""
+    script_path = os.path.join(REPO_ROOT, script)
+    env = dict(os.environ, STREAMLIT_BROWSER_GATHER_USAGE_STATS="false")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER.format(root=REPO_ROOT, script=script_path)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{script} failed to run:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def imported_modules(entries: List[Tuple[str, int, int, int]]) -> Set[str]:
+    """Names of all modules in a parsed report."""
+    return {module for module, _, _, _ in entries}
+
+
+def total_ms(entries: List[Tuple[str, int, int, int]]) -> float:
+    """Total import time in milliseconds (sum of self times)."""
+    return sum(self_us for _, self_us, _, _ in entries) / 1000
+
+
+def summarize(entries: List[Tuple[str, int, int, int]]) -> Dict[str, float]:
+    """Self time in milliseconds per top-level package, slowest first."""
+    totals = defaultdict(float)
+    for module, self_us, _, _ in entries:
+        totals[module.split(".")[0]] += self_us / 1000
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(script: str, entries: List[Tuple[str, int, int, int]], top: int = 15) -> str:
+    """Format the import summary for one script."""
+    lines = [
+        f"{script}: {total_ms(entries):.1f} ms across {len(entries)} modules "
+        f"(budget {COLD_START_BUDGET_MS} ms)",
+    ]
+    for package, ms in list(summarize(entries).items())[:top]:
+        lines.append(f"  {ms:9.1f} ms  {package}")
+
+    loaded = sorted(m for m in DEFERRED_MODULES if m in imported_modules(entries))
+    if loaded:
+        lines.append(f"  deferred modules imported at startup: {', '.join(loaded)}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scripts", nargs="*", default=list(SCRIPTS), help="scripts relative to the repo root")
+    parser.add_argument("--top", type=int, default=15, help="number of packages to list")
+    args = parser.parse_args()
+
+    over_budget = False
+    for script in args.scripts:
+        entries = measure_script(script)
+        print(format_report(script, entries, args.top))
+        print()
+        over_budget = over_budget or total_ms(entries) > COLD_START_BUDGET_MS
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
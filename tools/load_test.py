@@ -0,0 +1,472 @@
+"""
+Offline load test for the Streamlit pages.
+
+One ingest run processes a fake video through app.py with Streamlit's
+AppTest. Then N simulated learners run load/answer/check/next loops
+concurrently against pages/1_Writing_Practice.py, with the fake LLM backend
+and a fake gTTS, so no network access is needed.
+
+All learners are sessions of a single in-process Streamlit runtime, as in
+one server replica: each learner thread connects a SessionDriver, which
+stands in for a browser tab and sends the same rerun requests the frontend
+sends over its websocket. Memory per session is the RSS the process gains
+while the sessions are alive, divided by the number of sessions.
+
+Usage:
+    python -m tools.load_test --users 8 --iterations 10 --llm-latency 0.2
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import ctypes
+import gc
+import json
+import math
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from utils.llm_backend import LLMBackend
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_ROOT, "app.py")
+PRACTICE_SCRIPT = os.path.join(REPO_ROOT, "pages", "1_Writing_Practice.py")
+
+FAKE_VIDEO_URL = "https://www.youtube.com/watch?v=loadtest000"
+
+FAKE_TRANSCRIPT = [
+    "Bonjour à tous et bienvenue sur la chaîne.",
+    "Aujourd'hui, nous allons parler de la cuisine française.",
+    "Je vais au marché tous les samedis matin.",
+    "Il faut acheter des légumes frais et du bon pain.",
+    "Ensuite, nous préparons le repas ensemble.",
+    "Merci d'avoir regardé cette vidéo.",
+]
+
+Latencies = Dict[str, List[float]]
+
+
+class FakeTTS:
+    """Stands in for gtts.gTTS."""
+
+    def __init__(self, text: str, lang: str = "fr", slow: bool = False):
+        self.text = text
+
+    def write_to_fp(self, fp) -> None:
+        fp.write(b"ID3" + self.text.encode("utf-8"))
+
+
+class FakeTranscriptApi:
+    """Stands in for youtube_transcript_api.YouTubeTranscriptApi."""
+
+    def list(self, video_id: str) -> "FakeTranscriptApi":
+        return self
+
+    def find_transcript(self, languages: List[str]) -> "FakeTranscriptApi":
+        return self
+
+    def fetch(self) -> List[Any]:
+        return [
+            types.SimpleNamespace(text=text, start=float(i * 4), duration=4.0)
+            for i, text in enumerate(FAKE_TRANSCRIPT)
+        ]
+
+
+@contextlib.contextmanager
+def offline_environment(workdir: str, llm_latency: float = 0.0, backend: Optional["LLMBackend"] = None):
+    """
+    Patch external services with fakes and run from a scratch directory.
+
+    LLM requests go to `backend`, or to a FakeBackend sleeping `llm_latency`
+    seconds per request. The pages read and write transcript files relative
+    to the working directory, so every simulated session shares `workdir`.
+    """
+    import youtube_transcript_api
+    import utils.audio_generator as audio_generator
+    import utils.llm_backend as llm_backend
+
+    saved = [
+        (youtube_transcript_api, "YouTubeTranscriptApi", youtube_transcript_api.YouTubeTranscriptApi),
+        (llm_backend, "_backend", llm_backend._backend),
+        (audio_generator, "gTTS", audio_generator.gTTS),
+    ]
+    saved_cwd = os.getcwd()
+
+    youtube_transcript_api.YouTubeTranscriptApi = FakeTranscriptApi
+    llm_backend._backend = backend or llm_backend.FakeBackend(latency=llm_latency)
+    audio_generator.gTTS = FakeTTS
+    audio_generator.synthesize_french_audio.clear()
+    os.chdir(workdir)
+    try:
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        for module, name, value in saved:
+            setattr(module, name, value)
+        audio_generator.synthesize_french_audio.clear()
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (Linux)."""
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def settled_rss_bytes() -> int:
+    """
+    RSS after collecting garbage and returning free heap pages to the OS.
+
+    Without the trim, memory freed by earlier work may or may not still be
+    resident, which swamps the growth of a few sessions.
+    """
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    return rss_bytes()
+
+
+def find_button(app, label: str):
+    """Find a button by its label."""
+    for button in app.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"No '{label}' button on the page")
+
+
+def timed_run(app, action: str, latencies: Latencies, timeout: float) -> None:
+    """Run one script rerun and record how long it took."""
+    start = time.perf_counter()
+    app.run(timeout=timeout)
+    latencies[action].append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(f"{action}: {app.exception[0].message}")
+
+
+def ingest_video(timeout: float = 60) -> Latencies:
+    """Process the fake video through app.py so transcripts exist on disk."""
+    from streamlit.testing.v1 import AppTest
+
+    latencies = defaultdict(list)
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+    timed_run(app, "app_load", latencies, timeout)
+    app.text_input[0].set_value(FAKE_VIDEO_URL)
+    find_button(app, "Process Video").click()
+    timed_run(app, "process_video", latencies, timeout)
+    return latencies
+
+
+@contextlib.contextmanager
+def shared_runtime(script_path: str) -> Iterator[Tuple[Any, asyncio.AbstractEventLoop]]:
+    """
+    Run one Streamlit runtime for `script_path` on a background event loop.
+
+    Yields:
+        The started Runtime and its event loop
+    """
+    from streamlit.runtime import Runtime, RuntimeConfig
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+    from streamlit.testing.v1.util import patch_config_options
+
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, name="load-test-runtime", daemon=True)
+    loop_thread.start()
+    # No file watchers: the scripts do not change during a run
+    with patch_config_options({"server.fileWatcherType": "none", "runner.fastReruns": True}):
+        runtime = Runtime(RuntimeConfig(
+            script_path=script_path,
+            media_file_storage=MemoryMediaFileStorage("/media"),
+            uploaded_file_manager=MemoryUploadedFileManager("/_stcore/upload_file"),
+            cache_storage_manager=MemoryCacheStorageManager(),
+        ))
+        try:
+            asyncio.run_coroutine_threadsafe(runtime.start(), loop).result(timeout=30)
+            yield runtime, loop
+        finally:
+            runtime.stop()
+
+            async def wait_stopped() -> None:
+                await runtime.stopped
+
+            asyncio.run_coroutine_threadsafe(wait_stopped(), loop).result(timeout=30)
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+            Runtime._instance = None
+
+
+def call_on_loop(loop: asyncio.AbstractEventLoop, fn: Callable[[], Any]) -> Any:
+    """Run `fn` on the event loop thread and return its result."""
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def run() -> None:
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+
+    loop.call_soon_threadsafe(run)
+    return future.result()
+
+
+class SessionDriver:
+    """
+    A simulated browser tab connected to a shared Streamlit runtime.
+
+    Implements the runtime's SessionClient interface. It keeps the elements
+    the latest runs drew and sends rerun requests carrying widget values,
+    scoped to a fragment when the widget lives in one, like the frontend.
+    """
+
+    client_context = None
+
+    def __init__(self, runtime: Any, loop: asyncio.AbstractEventLoop):
+        self.runtime = runtime
+        self.loop = loop
+        self.messages: "queue.Queue[Any]" = queue.Queue()
+        # delta path -> (fragment id, element) for everything on screen
+        self.elements: Dict[Tuple[int, ...], Tuple[str, Any]] = {}
+        self.values: Dict[str, Any] = {}
+        self.session_id = call_on_loop(loop, lambda: runtime.connect_session(client=self, user_info={}))
+
+    def write_forward_msg(self, msg: Any) -> None:
+        """Called by the runtime, on its event loop, for every message."""
+        self.messages.put(msg)
+
+    def close(self) -> None:
+        call_on_loop(self.loop, lambda: self.runtime.close_session(self.session_id))
+
+    def find_widget(self, kind: str, label: Optional[str] = None) -> Tuple[str, Any]:
+        """Find a widget on screen by element type and label."""
+        for path in sorted(self.elements):
+            fragment_id, element = self.elements[path]
+            if element.WhichOneof("type") != kind:
+                continue
+            widget = getattr(element, kind)
+            if label is None or widget.label == label:
+                return fragment_id, widget
+        raise LookupError(f"No {kind} {label or ''} on the page")
+
+    def has_widget(self, kind: str, label: Optional[str] = None) -> bool:
+        try:
+            self.find_widget(kind, label)
+        except LookupError:
+            return False
+        return True
+
+    def run(self, fragment_id: str = "", trigger: Optional[str] = None, timeout: float = 60) -> None:
+        """Send one rerun request and wait until the run it starts has finished."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.fragment_id = fragment_id
+        for state in self.values.values():
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+        if trigger is not None:
+            button = msg.rerun_script.widget_states.widgets.add()
+            button.id = trigger
+            button.trigger_value = True
+        call_on_loop(self.loop, lambda: self.runtime.handle_backmsg(self.session_id, msg))
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                forward = self.messages.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise TimeoutError(f"Script run did not finish within {timeout} s") from None
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                # A full run redraws the page; a fragment run only its fragment
+                ran = set(forward.new_session.fragment_ids_this_run)
+                self.elements = {
+                    path: entry for path, entry in self.elements.items() if ran and entry[0] not in ran
+                }
+            elif kind == "delta" and forward.delta.HasField("new_element"):
+                element = forward.delta.new_element
+                if element.WhichOneof("type") == "exception":
+                    raise RuntimeError(element.exception.message)
+                self.elements[tuple(forward.metadata.delta_path)] = (forward.delta.fragment_id, element)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Script failed to compile")
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    def click(self, label: str, timeout: float = 60) -> None:
+        """Click a button and wait for the resulting run."""
+        fragment_id, button = self.find_widget("button", label)
+        if button.disabled:
+            raise RuntimeError(f"'{label}' button is disabled")
+        self.run(fragment_id, trigger=button.id, timeout=timeout)
+
+    def type_text(self, text: str, timeout: float = 60) -> None:
+        """Enter text in the text area and wait for the resulting run."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        fragment_id, text_area = self.find_widget("text_area")
+        state = WidgetState(id=text_area.id, string_value=text)
+        self.values[text_area.id] = state
+        self.run(fragment_id, timeout=timeout)
+
+
+def timed_action(action: str, latencies: Latencies, fn: Callable[[], None]) -> None:
+    """Run one user action and record how long its rerun took."""
+    start = time.perf_counter()
+    fn()
+    latencies[action].append(time.perf_counter() - start)
+
+
+def simulate_learner(session: SessionDriver, iterations: int, timeout: float = 60) -> Latencies:
+    """
+    One learner session: load transcripts, then answer/check/next in a loop.
+
+    Returns:
+        Per-action rerun latencies in seconds
+    """
+    latencies: Latencies = defaultdict(list)
+    timed_action("page_load", latencies, lambda: session.run(timeout=timeout))
+    timed_action("load_transcripts", latencies, lambda: session.click("Load Transcripts", timeout))
+
+    for i in range(iterations):
+        if session.has_widget("button", "Start Over"):
+            timed_action("start_over", latencies, lambda: session.click("Start Over", timeout))
+        timed_action("answer", latencies, lambda: session.type_text(f"Réponse numéro {i}", timeout))
+        timed_action("check", latencies, lambda: session.click("Check Translation", timeout))
+        timed_action("next", latencies, lambda: session.click("Next Sentence", timeout))
+    return dict(latencies)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_load_test(users: int, iterations: int, llm_latency: float = 0.0, timeout: float = 60) -> Dict[str, Any]:
+    """
+    Run the full offline load test, all learners sharing one runtime.
+
+    Returns:
+        Report dictionary with throughput, per-action latency percentiles
+        (milliseconds) and memory figures (MiB)
+    """
+    with tempfile.TemporaryDirectory() as workdir, offline_environment(workdir, llm_latency):
+        ingest = ingest_video(timeout)
+
+        with shared_runtime(PRACTICE_SCRIPT) as (runtime, loop):
+            rss_base = settled_rss_bytes()
+            sessions = [SessionDriver(runtime, loop) for _ in range(users)]
+            outcomes: List[Tuple[str, Any]] = [("error", "did not finish")] * users
+
+            def learner(i: int) -> None:
+                try:
+                    outcomes[i] = ("ok", simulate_learner(sessions[i], iterations, timeout))
+                except Exception as e:
+                    outcomes[i] = ("error", f"{type(e).__name__}: {e}")
+
+            start = time.perf_counter()
+            threads = [threading.Thread(target=learner, args=(i,), name=f"learner-{i}") for i in range(users)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            # Measured while every session and its state is still alive
+            rss_sessions = settled_rss_bytes() - rss_base
+            for session in sessions:
+                session.close()
+
+    errors = [outcome for status, outcome in outcomes if status == "error"]
+    if errors:
+        raise RuntimeError(f"{len(errors)} of {users} learners failed: {errors[0]}")
+    results = [outcome for _, outcome in outcomes]
+
+    latencies = defaultdict(list)
+    for source in [ingest] + results:
+        for action, values in source.items():
+            latencies[action].extend(values)
+
+    learner_reruns = sum(
+        len(values) for session_latencies in results for values in session_latencies.values()
+    )
+    all_reruns = [value for action, values in latencies.items() if action not in ingest for value in values]
+
+    return {
+        "users": users,
+        "iterations": iterations,
+        "llm_latency_s": llm_latency,
+        "wall_time_s": elapsed,
+        "reruns": learner_reruns,
+        "reruns_per_s": learner_reruns / elapsed if elapsed else 0.0,
+        "checks_per_s": users * iterations / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            action: {
+                "count": len(values),
+                "p50": percentile(values, 50) * 1000,
+                "p90": percentile(values, 90) * 1000,
+                "p99": percentile(values, 99) * 1000,
+                "max": max(values) * 1000,
+                "mean": statistics.fmean(values) * 1000,
+            }
+            for action, values in latencies.items()
+        },
+        "all_reruns_p50_ms": percentile(all_reruns, 50) * 1000,
+        "all_reruns_p99_ms": percentile(all_reruns, 99) * 1000,
+        "rss_base_mib": rss_base / 2**20,
+        "rss_sessions_mib": rss_sessions / 2**20,
+        "rss_per_session_mib": rss_sessions / users / 2**20,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a load test report as a text table."""
+    lines = [
+        f"{report['users']} users x {report['iterations']} iterations "
+        f"(fake LLM latency {report['llm_latency_s'] * 1000:.0f} ms)",
+        f"wall time       {report['wall_time_s']:.2f} s",
+        f"throughput      {report['reruns_per_s']:.1f} reruns/s, {report['checks_per_s']:.2f} checks/s",
+        f"all reruns      p50 {report['all_reruns_p50_ms']:.1f} ms, p99 {report['all_reruns_p99_ms']:.1f} ms",
+        f"memory          {report['rss_base_mib']:.1f} MiB base, {report['rss_sessions_mib']:.1f} MiB "
+        f"for {report['users']} sessions ({report['rss_per_session_mib']:.2f} MiB per session)",
+        "",
+        f"{'action':<18}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}",
+    ]
+    for action, stats in report["latency_ms"].items():
+        lines.append(
+            f"{action:<18}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p90']:>10.1f}"
+            f"{stats['p99']:>10.1f}{stats['max']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=4, help="concurrent simulated learners")
+    parser.add_argument("--iterations", type=int, default=5, help="answer/check/next loops per learner")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds each fake LLM request sleeps")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    report = run_load_test(args.users, args.iterations, args.llm_latency)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,79 @@
 """Audio generation utilities for French text-to-speech."""
 
 import io
-from gtts import gTTS
+import os
+from typing import Optional
+
 import streamlit as st
 
+from utils.profiler import timed
+
+# gtts is imported by synthesize_french_audio the first time audio is needed
+gTTS = None
+
+# Synthesized MP3s, one file per catalog audio key
+AUDIO_STORE_DIR = "audio_cache"
+
+
+def audio_store_path(key: str) -> str:
+    """Path of the stored MP3 for an audio key."""
+    return os.path.join(AUDIO_STORE_DIR, f"{key}.mp3")
+
+
+def load_stored_audio(key: str) -> Optional[bytes]:
+    """Stored MP3 bytes for an audio key, or None if not stored yet."""
+    try:
+        with open(audio_store_path(key), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def store_audio(key: str, audio: bytes) -> None:
+    """Atomically store MP3 bytes under an audio key."""
+    path = audio_store_path(key)
+    os.makedirs(AUDIO_STORE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(audio)
+    os.replace(tmp_path, path)
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+@timed("gtts")
+def synthesize_french_audio(text: str) -> bytes:
+    """
+    Synthesize French speech as MP3 bytes.
+
+    Cached per text, so reruns and other sessions replaying the same
+    sentence skip the gTTS round trip. The MP3 is also kept in the audio
+    store under the sentence's catalog audio key, which is checked first,
+    so audio survives restarts.
+    """
+    from utils.catalog import audio_key
+
+    key = audio_key(text)
+    stored = load_stored_audio(key)
+    if stored is not None:
+        return stored
+
+    global gTTS
+    if gTTS is None:
+        from gtts import gTTS
+
+    tts = gTTS(text=text, lang='fr', slow=False)
+    audio_bytes = io.BytesIO()
+    tts.write_to_fp(audio_bytes)
+    audio = audio_bytes.getvalue()
+    try:
+        store_audio(key, audio)
+    except OSError:
+        # The store only saves a round trip next time
+        pass
+    return audio
+
 
+@timed()
 def play_french_audio(text: str) -> bool:
     """
     Generate and play audio for French text.
@@ -19,11 +88,7 @@ def play_french_audio(text: str) -> bool:
         return False
 
     try:
-        tts = gTTS(text=text, lang='fr', slow=False)
-        audio_bytes = io.BytesIO()
-        tts.write_to_fp(audio_bytes)
-        audio_bytes.seek(0)
-        st.audio(audio_bytes, format='audio/mp3')
+        st.audio(synthesize_french_audio(text), format='audio/mp3')
         return True
     except Exception as e:
         st.caption(f"Audio unavailable: {e}")
@@ -0,0 +1,401 @@
+"""
+Catalog of processed videos stored as a compact, checksummed binary snapshot.
+
+Layout (little-endian):
+
+    magic       b"FLCAT\\x00\\x01\\n"
+    header      uint32 length, uint32 crc32, JSON {"version", "feature_names"}
+    block*      uint32 videos, uint32 sentences, uint32 payload length,
+                uint32 crc32 of the payload, then the zlib-compressed payload
+
+Each block payload holds its videos column by column:
+
+    sentence counts     uint32[videos]
+    video ids           uint32[videos + 1] offsets, UTF-8 bytes
+    French sentences    uint32[sentences + 1] offsets, UTF-8 bytes
+    English sentences   uint32[sentences + 1] offsets, UTF-8 bytes
+    start times         float32[sentences]
+    features            float32[features][sentences], in header order
+    audio keys          16 bytes per sentence, naming its MP3 in the audio store
+
+Blocks are independent, so processing a video appends one block and a
+snapshot is read in a single pass with one block in memory at a time.
+An append interrupted by a crash leaves a torn final block, which the
+next append cuts off and the local catalog reader skips.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+
+from utils.difficulty import FEATURE_NAMES, compute_features
+from utils.sentence_parser import align_sentences, parse_sentences
+
+DEFAULT_CATALOG_PATH = "video_catalog.bin"
+
+MAGIC = b"FLCAT\x00\x01\n"
+FORMAT_VERSION = 1
+AUDIO_KEY_SIZE = 16
+
+# Videos per block when writing a whole snapshot
+BLOCK_VIDEOS = 256
+
+_HEADER = struct.Struct("<II")
+_BLOCK = struct.Struct("<IIII")
+
+_catalog = None
+_catalog_mtime = None
+
+_write_lock = threading.Lock()
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is truncated, corrupted or incompatible."""
+
+
+class VideoRecord(NamedTuple):
+    """One processed video: aligned sentences and their per-sentence data."""
+
+    video_id: str
+    french: List[str]
+    english: List[str]
+    starts: np.ndarray
+    features: Dict[str, np.ndarray]
+    audio_keys: List[str]
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        """Aligned (french, english) sentence pairs."""
+        return list(zip(self.french, self.english))
+
+
+def audio_key(text: str) -> str:
+    """Key of a French sentence's synthesized audio in the audio store (see utils.audio_generator)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=AUDIO_KEY_SIZE).hexdigest()
+
+
+def sentence_starts(snippets: Sequence[Tuple[str, float]], sentences: Sequence[str]) -> np.ndarray:
+    """
+    Start time of each sentence: the start of the snippet it begins in.
+
+    Args:
+        snippets: (text, start seconds) transcript snippets, in order
+        sentences: Sentences parsed from the snippets joined with spaces
+
+    Returns:
+        float32 array of start times, one per sentence
+    """
+    offsets = []
+    position = 0
+    for text, _ in snippets:
+        offsets.append(position)
+        position += len(text) + 1
+    text = " ".join(text for text, _ in snippets)
+
+    starts = np.zeros(len(sentences), dtype=np.float32)
+    cursor = 0
+    for i, sentence in enumerate(sentences):
+        found = text.find(sentence, cursor)
+        if found == -1:
+            starts[i] = starts[i - 1] if i else 0.0
+            continue
+        cursor = found + len(sentence)
+        starts[i] = snippets[bisect.bisect_right(offsets, found) - 1][1] if snippets else 0.0
+    return starts
+
+
+def build_record(video_id: str, snippets: Sequence[Tuple[str, float]], english_text: str) -> VideoRecord:
+    """
+    Build the catalog record of a processed video.
+
+    Args:
+        video_id: YouTube video ID
+        snippets: (text, start seconds) French transcript snippets
+        english_text: The full English translation
+
+    Returns:
+        VideoRecord with the aligned pairs, start times, difficulty
+        features and audio keys
+    """
+    french_text = " ".join(text for text, _ in snippets)
+    pairs = align_sentences(parse_sentences(french_text), parse_sentences(english_text))
+    french = [f for f, _ in pairs]
+    features = compute_features(french)
+    return VideoRecord(
+        video_id=video_id,
+        french=french,
+        english=[e for _, e in pairs],
+        starts=sentence_starts(snippets, french),
+        features={name: features[name].astype(np.float32) for name in FEATURE_NAMES},
+        audio_keys=[audio_key(f) for f in french],
+    )
+
+
+def _encode_strings(strings: Sequence[str]) -> List[bytes]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return [offsets.tobytes(), b"".join(encoded)]
+
+
+def _encode_block(records: Sequence[VideoRecord]) -> bytes:
+    counts = np.array([len(record.french) for record in records], dtype="<u4")
+    total = int(counts.sum())
+    columns = [counts.tobytes()]
+    columns += _encode_strings([record.video_id for record in records])
+    columns += _encode_strings([s for record in records for s in record.french])
+    columns += _encode_strings([s for record in records for s in record.english])
+    if total:
+        columns.append(np.concatenate([record.starts for record in records]).astype("<f4").tobytes())
+        for name in FEATURE_NAMES:
+            columns.append(np.concatenate([record.features[name] for record in records]).astype("<f4").tobytes())
+    columns.append(b"".join(bytes.fromhex(key) for record in records for key in record.audio_keys))
+
+    payload = zlib.compress(b"".join(columns), 6)
+    return _BLOCK.pack(len(records), total, len(payload), zlib.crc32(payload)) + payload
+
+
+def _write_header(f: BinaryIO) -> None:
+    header = json.dumps({"version": FORMAT_VERSION, "feature_names": list(FEATURE_NAMES)}).encode("utf-8")
+    f.write(MAGIC + _HEADER.pack(len(header), zlib.crc32(header)) + header)
+
+
+def write_snapshot(path: str, records: Iterable[VideoRecord], block_videos: int = BLOCK_VIDEOS) -> None:
+    """Atomically write records to a new snapshot, `block_videos` per block."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        _write_header(f)
+        block: List[VideoRecord] = []
+        for record in records:
+            block.append(record)
+            if len(block) == block_videos:
+                f.write(_encode_block(block))
+                block = []
+        if block:
+            f.write(_encode_block(block))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _complete_length(f: BinaryIO) -> int:
+    """
+    Length of the snapshot up to its last complete block.
+
+    The framing is checked with a seek per block, and only the final
+    block's checksum is verified. A torn header gives 0.
+
+    Raises:
+        SnapshotError: if the file is not a snapshot
+    """
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        if MAGIC.startswith(magic):
+            return 0
+        raise SnapshotError("Not a catalog snapshot")
+    header = f.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        return 0
+    position = len(MAGIC) + _HEADER.size + _HEADER.unpack(header)[0]
+    if position > size:
+        return 0
+    last = None
+    while position + _BLOCK.size <= size:
+        f.seek(position)
+        end = position + _BLOCK.size + _BLOCK.unpack(f.read(_BLOCK.size))[2]
+        if end > size:
+            break
+        last, position = position, end
+    if last is not None:
+        f.seek(last)
+        crc = _BLOCK.unpack(f.read(_BLOCK.size))[3]
+        if zlib.crc32(f.read(position - last - _BLOCK.size)) != crc:
+            return last
+    return position
+
+
+@contextmanager
+def catalog_lock(path: str) -> Iterator[None]:
+    """
+    Hold the write lock of the catalog at `path`.
+
+    A lock within the process plus an exclusive lock on the `<path>.lock`
+    sidecar across processes. The sidecar is locked rather than the
+    catalog because replacing the catalog swaps its inode, and a writer
+    holding a lock on the old one would append to the unlinked file.
+    """
+    with _write_lock, open(f"{path}.lock", "a+b") as lock_file:
+        if fcntl is not None:
+            # Released when the file is closed
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def append_records(path: str, records: Sequence[VideoRecord]) -> None:
+    """
+    Durably append records to a snapshot as one block, creating the file if needed.
+
+    Appends hold catalog_lock(), so only the first writes the header and
+    none is lost to a concurrent import. A torn block left by an
+    interrupted append is cut off first, and each block is fsynced before
+    returning.
+    """
+    block = _encode_block(records)
+    with catalog_lock(path), open(path, "a+b") as f:
+        length = _complete_length(f)
+        if length != f.seek(0, os.SEEK_END):
+            f.truncate(length)
+        if length == 0:
+            _write_header(f)
+        f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_exact(f: BinaryIO, size: int, what: str) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise SnapshotError(f"Truncated snapshot: incomplete {what}")
+    return data
+
+
+class _Columns:
+    """Sequential reader over a decompressed block payload."""
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.position = 0
+
+    def take(self, size: int) -> memoryview:
+        if self.position + size > len(self.payload):
+            raise SnapshotError("Corrupted block: column runs past the payload")
+        view = memoryview(self.payload)[self.position:self.position + size]
+        self.position += size
+        return view
+
+    def array(self, dtype: str, count: int) -> np.ndarray:
+        return np.frombuffer(self.take(count * np.dtype(dtype).itemsize), dtype=dtype)
+
+    def strings(self, count: int) -> List[str]:
+        offsets = self.array("<u4", count + 1).tolist()
+        blob = bytes(self.take(offsets[-1]))
+        return [blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+
+def _decode_block(payload: bytes, videos: int, sentences: int, feature_names: List[str]) -> List[VideoRecord]:
+    columns = _Columns(payload)
+    counts = columns.array("<u4", videos)
+    if int(counts.sum()) != sentences:
+        raise SnapshotError("Corrupted block: sentence counts do not add up")
+    video_ids = columns.strings(videos)
+    french = columns.strings(sentences)
+    english = columns.strings(sentences)
+    if sentences:
+        starts = columns.array("<f4", sentences)
+        features = {name: columns.array("<f4", sentences) for name in feature_names}
+    else:
+        starts = np.zeros(0, dtype="<f4")
+        features = {name: np.zeros(0, dtype="<f4") for name in feature_names}
+    keys = bytes(columns.take(sentences * AUDIO_KEY_SIZE)).hex()
+    if columns.position != len(payload):
+        raise SnapshotError("Corrupted block: unexpected trailing data")
+
+    records = []
+    bounds = [0] + np.cumsum(counts, dtype=np.int64).tolist()
+    for i, video_id in enumerate(video_ids):
+        lo, hi = bounds[i], bounds[i + 1]
+        records.append(VideoRecord(
+            video_id=video_id,
+            french=french[lo:hi],
+            english=english[lo:hi],
+            starts=starts[lo:hi],
+            features={name: values[lo:hi] for name, values in features.items()},
+            audio_keys=[keys[2 * AUDIO_KEY_SIZE * j:2 * AUDIO_KEY_SIZE * (j + 1)] for j in range(lo, hi)],
+        ))
+    return records
+
+
+def iter_snapshot(path: str, skip_torn_tail: bool = False) -> Iterator[VideoRecord]:
+    """
+    Stream the records of a snapshot in a single pass, verifying checksums.
+
+    Args:
+        path: Snapshot file
+        skip_torn_tail: Stop quietly at an incomplete final block, or at a
+            final block failing its checksum, as an interrupted append
+            leaves them; the blocks before it are still returned
+
+    Raises:
+        SnapshotError: if the file is not a snapshot, is truncated, fails a
+            checksum, or lacks features this version needs
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f"{path} is not a catalog snapshot")
+        length, crc = _HEADER.unpack(_read_exact(f, _HEADER.size, "header"))
+        header_bytes = _read_exact(f, length, "header")
+        if zlib.crc32(header_bytes) != crc:
+            raise SnapshotError("Header checksum mismatch")
+        header = json.loads(header_bytes)
+        if header.get("version") != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version: {header.get('version')}")
+        feature_names = header["feature_names"]
+        missing = set(FEATURE_NAMES) - set(feature_names)
+        if missing:
+            raise SnapshotError(f"Snapshot lacks features: {', '.join(sorted(missing))}")
+
+        while True:
+            block_header = f.read(_BLOCK.size)
+            if not block_header:
+                return
+            try:
+                if len(block_header) != _BLOCK.size:
+                    raise SnapshotError("Truncated snapshot: incomplete block header")
+                videos, sentences, length, crc = _BLOCK.unpack(block_header)
+                payload = _read_exact(f, length, "block")
+                if zlib.crc32(payload) != crc:
+                    raise SnapshotError("Block checksum mismatch")
+            except SnapshotError:
+                # Only the final block can be torn
+                if skip_torn_tail and not f.read(1):
+                    return
+                raise
+            try:
+                payload = zlib.decompress(payload)
+            except zlib.error as e:
+                raise SnapshotError(f"Corrupted block: {e}") from e
+            yield from _decode_block(payload, videos, sentences, feature_names)
+
+
+def load_catalog(path: str = DEFAULT_CATALOG_PATH, skip_torn_tail: bool = False) -> Dict[str, VideoRecord]:
+    """Load a snapshot keyed by video ID; later records replace earlier ones."""
+    return {record.video_id: record for record in iter_snapshot(path, skip_torn_tail)}
+
+
+def get_catalog(path: str = DEFAULT_CATALOG_PATH) -> Dict[str, VideoRecord]:
+    """
+    Get the process-wide catalog, reloading it when the file changes.
+
+    A torn final block from an interrupted append is skipped, so the
+    videos before it stay available.
+    """
+    global _catalog, _catalog_mtime
+    mtime: Optional[float] = os.path.getmtime(path) if os.path.exists(path) else None
+    if _catalog is None or mtime != _catalog_mtime:
+        _catalog = load_catalog(path, skip_torn_tail=True) if mtime is not None else {}
+        _catalog_mtime = mtime
+    return _catalog
@@ -0,0 +1,301 @@
+"""Sentence difficulty scoring for French practice sentences."""
+
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+FREQUENCY_LIST_PATH = os.path.join(os.path.dirname(__file__), "data", "french_frequency.txt")
+
+LEVELS = ("Beginner", "Intermediate", "Advanced")
+
+# Upper bounds of the Beginner and Intermediate score bands
+LEVEL_THRESHOLDS = (35.0, 55.0)
+
+FEATURE_NAMES = (
+    "word_count",
+    "mean_log_rank",
+    "rare_word_ratio",
+    "rare_tense_count",
+    "punctuation_count",
+)
+
+# Contribution of each normalized feature to the 0-100 score
+FEATURE_WEIGHTS = {
+    "word_count": 30.0,
+    "mean_log_rank": 25.0,
+    "rare_word_ratio": 20.0,
+    "rare_tense_count": 10.0,
+    "punctuation_count": 15.0,
+}
+
+# Bump when feature extraction or scoring changes, so saved features from
+# an older version are recomputed
+SCORING_VERSION = 2
+
+# Values at which a feature saturates during normalization
+MAX_WORD_COUNT = 40
+MAX_RARE_TENSES = 2
+MAX_PUNCTUATION = 6
+
+WORD_PATTERN = re.compile(r"[a-zàâäçéèêëîïôöùûüÿœæ]+(?:-[a-zàâäçéèêëîïôöùûüÿœæ]+)*")
+
+# Passé simple and imparfait du subjonctif endings (e.g. parlèrent, fussent).
+# -issions/-issiez are left out: for -ir verbs they are also the ordinary
+# imparfait (finissions).
+RARE_TENSE_PATTERN = re.compile(
+    r"(\w+?)(âmes|âtes|èrent|îmes|îtes|ûmes|ûtes|assent|assiez|assions|"
+    r"ussent|ussiez|ussions|ât|ît|ût)$"
+)
+
+# Endings that also spell present-tense verbs (passent, poussent) and noun
+# plurals (pâtes, discussions), and the stems that give those readings away
+AMBIGUOUS_STEMS = {
+    # -er stems are rarely one or two letters, -asser verbs often are:
+    # passent, classent, chassent, passions
+    "assent": lambda stem: len(stem) <= 2,
+    "assiez": lambda stem: len(stem) <= 2,
+    "assions": lambda stem: len(stem) <= 2,
+    # poussent, toussent; discussions, percussions
+    "ussent": lambda stem: stem.endswith("o"),
+    "ussiez": lambda stem: stem.endswith("o"),
+    "ussions": lambda stem: stem.endswith(("o", "c")),
+    # pâtes, hâtes, gâtes
+    "âtes": lambda stem: len(stem) <= 1,
+    # boîtes, faîtes; plaît, connaît, naît
+    "îtes": lambda stem: stem[-1] in "aeiouy",
+    "ît": lambda stem: stem[-1] in "aeiouy",
+}
+
+# Common words that happen to share a rare tense ending
+RARE_TENSE_EXCEPTIONS = {
+    "goût", "dégoût", "coût", "surcoût", "août", "moût",
+    "dégât", "mât", "gîtes",
+    "préfèrent", "espèrent", "considèrent", "gèrent", "suggèrent",
+    "exagèrent", "accélèrent", "répètent", "opèrent", "délibèrent",
+    "amassent", "ramassent", "embrassent", "dépassent", "surpassent",
+    "repassent", "fracassent", "tracassent", "compassions",
+}
+
+PUNCTUATION_MARKS = (",", ";", ":", "(", "«", "—", "–", '"')
+
+_frequency_ranks = None
+
+
+def load_frequency_ranks(path: str = FREQUENCY_LIST_PATH) -> Dict[str, int]:
+    """
+    Load the bundled French frequency list as a word -> rank mapping.
+
+    Ranks start at 1 for the most frequent word. Lines starting with '#'
+    are comments.
+    """
+    ranks = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word and not word.startswith('#') and word not in ranks:
+                ranks[word] = len(ranks) + 1
+    return ranks
+
+
+def get_frequency_ranks() -> Dict[str, int]:
+    """Get or load the cached frequency ranks."""
+    global _frequency_ranks
+    if _frequency_ranks is None:
+        _frequency_ranks = load_frequency_ranks()
+    return _frequency_ranks
+
+
+def is_rare_tense(word: str) -> bool:
+    """
+    Whether a lowercase word looks like a passé simple or imparfait du subjonctif form.
+
+    Words whose stem marks them as a present-tense verb or a noun plural
+    sharing the ending (passent, discussions, boîtes) are not counted.
+    """
+    if word in RARE_TENSE_EXCEPTIONS:
+        return False
+    match = RARE_TENSE_PATTERN.match(word)
+    if match is None:
+        return False
+    stem, ending = match.groups()
+    ambiguous = AMBIGUOUS_STEMS.get(ending)
+    return ambiguous is None or not ambiguous(stem)
+
+
+def compute_features(
+    sentences: Sequence[str],
+    frequency_ranks: Optional[Dict[str, int]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute difficulty features for a batch of sentences.
+
+    Tokens from every sentence are flattened into a single array so that the
+    per-word lookups happen once per distinct word and the per-sentence
+    aggregation is done with NumPy rather than a Python loop.
+
+    Args:
+        sentences: French sentences to score
+        frequency_ranks: Word -> rank mapping (defaults to the bundled list)
+
+    Returns:
+        Dictionary mapping each name in FEATURE_NAMES to a float array
+    """
+    if frequency_ranks is None:
+        frequency_ranks = get_frequency_ranks()
+
+    n = len(sentences)
+    if n == 0:
+        return {name: np.zeros(0, dtype=np.float64) for name in FEATURE_NAMES}
+
+    tokenized = [WORD_PATTERN.findall(s.lower()) for s in sentences]
+    counts = np.fromiter((len(t) for t in tokenized), dtype=np.int64, count=n)
+    tokens = [token for sentence_tokens in tokenized for token in sentence_tokens]
+
+    vocabulary = {}
+    token_ids = np.fromiter(
+        (vocabulary.setdefault(token, len(vocabulary)) for token in tokens),
+        dtype=np.int64,
+        count=len(tokens)
+    )
+    words = list(vocabulary)
+
+    oov_rank = 2 * (len(frequency_ranks) + 1)
+    word_ranks = np.array([frequency_ranks.get(w, oov_rank) for w in words], dtype=np.float64)
+    word_is_rare = word_ranks == oov_rank
+    word_has_rare_tense = np.array(
+        # Words common enough to be in the frequency list are not rare forms
+        [w not in frequency_ranks and is_rare_tense(w) for w in words],
+        dtype=bool
+    )
+
+    sentence_ids = np.repeat(np.arange(n), counts)
+    safe_counts = np.maximum(counts, 1)
+
+    log_ranks = np.log(word_ranks)[token_ids] if len(words) else np.zeros(0)
+    mean_log_rank = np.bincount(sentence_ids, weights=log_ranks, minlength=n) / safe_counts
+    rare_words = np.bincount(sentence_ids, weights=word_is_rare[token_ids], minlength=n)
+    rare_tenses = np.bincount(sentence_ids, weights=word_has_rare_tense[token_ids], minlength=n)
+
+    text = np.array(sentences, dtype=np.str_)
+    punctuation = np.zeros(n, dtype=np.float64)
+    for mark in PUNCTUATION_MARKS:
+        punctuation += np.char.count(text, mark)
+
+    return {
+        "word_count": counts.astype(np.float64),
+        "mean_log_rank": mean_log_rank / np.log(oov_rank),
+        "rare_word_ratio": rare_words / safe_counts,
+        "rare_tense_count": rare_tenses,
+        "punctuation_count": punctuation,
+    }
+
+
+def score_features(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Combine features into a difficulty score between 0 and 100.
+
+    Each feature is normalized against a fixed ceiling (not the catalog
+    maximum) so scores stay comparable across videos.
+    """
+    normalized = {
+        "word_count": np.minimum(features["word_count"] / MAX_WORD_COUNT, 1.0),
+        "mean_log_rank": features["mean_log_rank"],
+        "rare_word_ratio": features["rare_word_ratio"],
+        "rare_tense_count": np.minimum(features["rare_tense_count"] / MAX_RARE_TENSES, 1.0),
+        "punctuation_count": np.minimum(features["punctuation_count"] / MAX_PUNCTUATION, 1.0),
+    }
+    score = sum(FEATURE_WEIGHTS[name] * normalized[name] for name in FEATURE_NAMES)
+    return np.clip(score, 0.0, 100.0)
+
+
+def score_sentences(sentences: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Compute features and the combined 'score' array for a batch of sentences."""
+    features = compute_features(sentences)
+    features["score"] = score_features(features)
+    return features
+
+
+def difficulty_levels(scores: np.ndarray) -> np.ndarray:
+    """Map scores to indices into LEVELS."""
+    return np.digitize(scores, LEVEL_THRESHOLDS)
+
+
+def select_sentences(
+    scores: np.ndarray,
+    levels: Optional[Iterable[str]] = None,
+    sort: bool = False
+) -> np.ndarray:
+    """
+    Select sentence indices for a practice session.
+
+    Args:
+        scores: Difficulty scores, one per sentence
+        levels: Level names to keep (all levels if None)
+        sort: Order from easiest to hardest instead of transcript order
+
+    Returns:
+        Array of indices into the sentence list
+    """
+    indices = np.arange(len(scores))
+    if levels is not None:
+        wanted = [LEVELS.index(level) for level in levels]
+        indices = indices[np.isin(difficulty_levels(scores), wanted)]
+    if sort:
+        indices = indices[np.argsort(scores[indices], kind="stable")]
+    return indices
+
+
+def sentences_digest(sentences: Sequence[str]) -> str:
+    """Hash identifying a list of sentences, stored with their features."""
+    digest = hashlib.blake2b(digest_size=16)
+    for sentence in sentences:
+        digest.update(sentence.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def save_difficulty(path: str, features: Dict[str, np.ndarray], sentences: Sequence[str]) -> None:
+    """Save difficulty features of `sentences` next to the transcript files."""
+    with open(path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            **features,
+            scoring_version=np.array(SCORING_VERSION),
+            sentences_hash=np.array(sentences_digest(sentences)),
+        )
+
+
+def load_difficulty(path: str, sentences: Sequence[str]) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load saved difficulty features for `sentences`.
+
+    Returns None if the file is missing or unreadable, was computed by
+    another scoring version, or for different sentences.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            features = {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None
+    version = features.pop("scoring_version", None)
+    sentences_hash = features.pop("sentences_hash", None)
+    if version is None or int(version) != SCORING_VERSION:
+        return None
+    if sentences_hash is None or str(sentences_hash) != sentences_digest(sentences):
+        return None
+    if "score" not in features or len(features["score"]) != len(sentences):
+        return None
+    return features
+
+
+def ensure_difficulty(path: str, french_sentences: List[str]) -> Dict[str, np.ndarray]:
+    """Load difficulty features for the sentences, recomputing them if stale."""
+    features = load_difficulty(path, french_sentences)
+    if features is None:
+        features = score_sentences(french_sentences)
+        save_difficulty(path, features, french_sentences)
+    return features
@@ -0,0 +1,215 @@
+"""Deadline-bounded, hedged calls for latency-sensitive LLM requests."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Deque, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_DEADLINE = 30.0
+DEFAULT_HEDGE_QUANTILE = 0.95
+
+# Until this many latencies are observed, hedge after a fixed delay
+MIN_SAMPLES = 20
+INITIAL_HEDGE_DELAY = 3.0
+
+LATENCY_SAMPLES = 200
+
+# Seconds between checks of whether a gated first attempt has been sent
+SENT_POLL_INTERVAL = 0.02
+
+Gate = Callable[[threading.Event, float], ContextManager[Any]]
+
+
+class AttemptCancelled(Exception):
+    """An attempt was cancelled before it was sent."""
+
+
+class _Attempt:
+    """One in-flight copy of a hedged call."""
+
+    __slots__ = ("future", "cancel", "started_at", "sent_at")
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self.cancel = threading.Event()
+        self.started_at = time.monotonic()
+        # Set once through the gate, when the call is actually made
+        self.sent_at: Optional[float] = None
+
+
+class HedgedCaller:
+    """
+    Runs a call with a deadline, hedging slow attempts with a duplicate.
+
+    If the first attempt has not answered once the observed latency
+    quantile has passed (p95 by default), a second identical attempt is
+    started and whichever succeeds first is returned. The other attempt is
+    cancelled: it is dropped if it has not started, and its cancel event is
+    set so calls that check it can stop early. Its result is discarded
+    either way.
+
+    The callable receives that cancel event and the seconds left before
+    the deadline, so it can pass a matching timeout to the client.
+
+    An optional gate, such as a scheduler slot, is entered around each
+    attempt. An attempt cancelled by the time it gets through the gate is
+    not sent, and the winner cancels the others before leaving its gate,
+    so a slot it hands on never carries a request nobody is waiting for.
+    Time spent waiting at the gate is not latency: samples and the hedge
+    delay count from when the first attempt is sent, so no hedge is
+    started while it still waits.
+    """
+
+    def __init__(
+        self,
+        deadline: float = DEFAULT_DEADLINE,
+        hedge_quantile: float = DEFAULT_HEDGE_QUANTILE,
+        min_samples: int = MIN_SAMPLES,
+        initial_hedge_delay: float = INITIAL_HEDGE_DELAY,
+        max_workers: int = 16
+    ):
+        self.deadline = deadline
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.initial_hedge_delay = initial_hedge_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-call")
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._counters = {
+            "calls": 0,
+            "hedged": 0,
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the first attempt before starting a hedge."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_hedge_delay
+            ordered = sorted(self._latencies)
+        return ordered[int(self.hedge_quantile * (len(ordered) - 1))]
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _start(
+        self,
+        fn: Callable[[threading.Event, float], T],
+        deadline_at: float,
+        gate: Optional[Gate],
+        attempts: List["_Attempt"]
+    ) -> "_Attempt":
+        attempt = _Attempt()
+        cancel = attempt.cancel
+
+        def run() -> T:
+            with gate(cancel, max(deadline_at - time.monotonic(), 0.0)) if gate else nullcontext():
+                if cancel.is_set():
+                    raise AttemptCancelled("attempt cancelled before it was sent")
+                attempt.sent_at = time.monotonic()
+                result = fn(cancel, max(deadline_at - attempt.sent_at, 0.0))
+                for other in list(attempts):
+                    if other is not attempt:
+                        other.cancel.set()
+                return result
+
+        attempt.future = self._executor.submit(run)
+        return attempt
+
+    def call(
+        self,
+        fn: Callable[[threading.Event, float], T],
+        deadline: Optional[float] = None,
+        gate: Optional[Gate] = None
+    ) -> T:
+        """
+        Run `fn(cancel_event, seconds_left)` with hedging.
+
+        Args:
+            fn: The call to make
+            deadline: Seconds to wait for an answer (defaults to self.deadline)
+            gate: `gate(cancel_event, seconds_left)` returns a context manager
+                entered around each attempt
+
+        Raises:
+            TimeoutError: if no attempt succeeds before the deadline
+            Exception: the last attempt's error if every attempt failed
+        """
+        deadline_at = time.monotonic() + (self.deadline if deadline is None else deadline)
+        self._count("calls")
+
+        attempts: List[_Attempt] = []
+        attempts.append(self._start(fn, deadline_at, gate, attempts))
+        hedge_delay = self.hedge_delay()
+
+        while True:
+            for index, attempt in enumerate(attempts):
+                if attempt.future.done() and attempt.future.exception() is None:
+                    sent_at = attempts[0].sent_at
+                    with self._lock:
+                        # The first attempt's time since it was sent: its
+                        # latency, or a lower bound on it when the hedge won
+                        if sent_at is not None:
+                            self._latencies.append(time.monotonic() - sent_at)
+                        self._counters["hedge_wins" if index else "primary_wins"] += 1
+                    self._cancel_others(attempts, attempt)
+                    return attempt.future.result()
+
+            running = [attempt.future for attempt in attempts if not attempt.future.done()]
+            now = time.monotonic()
+            # Not before the first attempt is sent: until then it is queued,
+            # and a hedge would only queue behind it
+            sent_at = attempts[0].sent_at
+            hedge_at = deadline_at if sent_at is None else min(sent_at + hedge_delay, deadline_at)
+
+            # Hedge once the delay has passed, or straight away if the
+            # first attempt already failed
+            if len(attempts) == 1 and now < deadline_at and (now >= hedge_at or not running):
+                self._count("hedged")
+                attempts.append(self._start(fn, deadline_at, gate, attempts))
+                continue
+
+            # Attempts given the time left end at the deadline, so past it
+            # their failures are timeouts too
+            if now >= deadline_at:
+                self._count("timeouts")
+                self._cancel_others(attempts, None)
+                raise TimeoutError(f"No response within {deadline_at - attempts[0].started_at:.1f}s")
+
+            if not running:
+                self._count("errors")
+                raise attempts[-1].future.exception()
+
+            if len(attempts) > 1:
+                wake_at = deadline_at
+            elif sent_at is None:
+                wake_at = min(now + SENT_POLL_INTERVAL, deadline_at)
+            else:
+                wake_at = hedge_at
+            wait(running, timeout=max(wake_at - now, 0.0), return_when=FIRST_COMPLETED)
+
+    @staticmethod
+    def _cancel_others(attempts: List["_Attempt"], winner: Optional["_Attempt"]) -> None:
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.cancel.set()
+                attempt.future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, the current hedge delay and how often hedging paid off."""
+        delay = self.hedge_delay()
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["samples"] = len(self._latencies)
+        stats["hedge_delay_s"] = delay
+        stats["hedge_rate"] = stats["hedged"] / stats["calls"] if stats["calls"] else 0.0
+        stats["hedge_win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+        return stats
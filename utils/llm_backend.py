@@ -0,0 +1,415 @@
+"""Pluggable chat-completion backends: Groq, OpenAI-compatible HTTP, and an offline fake."""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Protocol
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+Messages = List[Dict[str, str]]
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Parallel requests used by complete_batch()
+BATCH_CONCURRENCY = 4
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class BackendConfigError(ValueError):
+    """Raised when the configured backend is unknown or missing settings."""
+
+
+class BackendRateLimited(Exception):
+    """Raised when a backend rejects a request for quota reasons (HTTP 429)."""
+
+
+class BackendCancelled(Exception):
+    """Raised when a request is abandoned because its cancel event was set."""
+
+
+class LLMBackend(Protocol):
+    """
+    Chat-completion backend used by translation and grading.
+
+    When a `cancel` event is given, setting it makes the request stop
+    reading the response, release its connection and raise
+    BackendCancelled.
+    """
+
+    name: str
+
+    def complete(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        """Return the full response text."""
+
+    def stream(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """Yield the response text in pieces as it is generated."""
+
+    def complete_batch(
+        self,
+        requests: List[Messages],
+        temperature: float = 0.3,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        """Return one response per request, in order."""
+
+
+def _check_cancelled(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise BackendCancelled("request cancelled")
+
+
+class _ConcurrentBatchMixin:
+    """complete_batch() implemented as parallel complete() calls."""
+
+    def complete_batch(
+        self,
+        requests: List[Messages],
+        temperature: float = 0.3,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        if not requests:
+            return []
+        with ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, len(requests))) as pool:
+            return list(pool.map(lambda messages: self.complete(messages, temperature, timeout), requests))
+
+
+class GroqBackend(_ConcurrentBatchMixin):
+    """Groq cloud API through the groq SDK."""
+
+    name = "groq"
+
+    def __init__(self, api_key: str, model: str = DEFAULT_MODEL):
+        # Imported here to keep the groq SDK off the pages' cold start
+        from groq import Groq
+
+        self.model = model
+        self.client = Groq(api_key=api_key)
+
+    def _create(self, messages: Messages, temperature: float, timeout: Optional[float], stream: bool):
+        import groq
+
+        try:
+            return self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                timeout=timeout,
+                stream=stream,
+            )
+        except groq.RateLimitError as e:
+            raise BackendRateLimited(str(e)) from e
+
+    def complete(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        if cancel is not None:
+            # Streamed so the response can be dropped between chunks
+            return "".join(self.stream(messages, temperature, timeout, cancel))
+        response = self._create(messages, temperature, timeout, stream=False)
+        return response.choices[0].message.content or ""
+
+    def stream(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        _check_cancelled(cancel)
+        response = self._create(messages, temperature, timeout, stream=True)
+        try:
+            for event in response:
+                _check_cancelled(cancel)
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+        finally:
+            response.close()
+
+
+class OpenAICompatibleBackend(_ConcurrentBatchMixin):
+    """Any server exposing POST /chat/completions (vLLM, llama.cpp, Ollama, ...)."""
+
+    name = "openai"
+
+    def __init__(self, base_url: str, model: str = DEFAULT_MODEL, api_key: Optional[str] = None):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.api_key = api_key
+
+    def _post(self, messages: Messages, temperature: float, timeout: Optional[float], stream: bool):
+        body = json.dumps({
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": stream,
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        try:
+            return urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise BackendRateLimited(f"{self.url} returned 429") from e
+            raise
+
+    def complete(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        if cancel is not None:
+            # Streamed so the response can be dropped between chunks
+            return "".join(self.stream(messages, temperature, timeout, cancel))
+        with self._post(messages, temperature, timeout, stream=False) as response:
+            data = json.loads(response.read().decode("utf-8"))
+        return data["choices"][0]["message"].get("content") or ""
+
+    def stream(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        _check_cancelled(cancel)
+        with self._post(messages, temperature, timeout, stream=True) as response:
+            # Server-sent events: "data: {json}" lines, ending with "data: [DONE]"
+            for raw_line in response:
+                # Leaving the block closes the connection
+                _check_cancelled(cancel)
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                choices = json.loads(payload).get("choices") or []
+                if choices and choices[0].get("delta", {}).get("content"):
+                    yield choices[0]["delta"]["content"]
+
+
+FAKE_EVALUATION = {
+    "overall_score": 82,
+    "meaning_preserved": True,
+    "critical_errors": [],
+    "minor_errors": [
+        {
+            "type": "ACCENT",
+            "original": "marché",
+            "student_wrote": "marche",
+            "explanation": "Missing accent on 'marché'.",
+        }
+    ],
+    "feedback": "Good translation, watch your accents.",
+    "corrected_version": "Je vais au marché.",
+}
+
+
+class FakeBackend:
+    """
+    Deterministic in-process backend for offline tests and load tests.
+
+    Grading prompts get FAKE_EVALUATION; translation prompts get each
+    input line back prefixed with "In English: ". `latency` seconds are
+    slept per request (per batch element for complete_batch), cut short
+    when the request's cancel event is set.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, responder: Optional[Callable[[Messages], str]] = None):
+        self.latency = latency
+        self.responder = responder or self.default_response
+        self.calls: List[Messages] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_response(messages: Messages) -> str:
+        if "evaluation" in messages[0]["content"]:
+            return json.dumps(FAKE_EVALUATION)
+        return "\n".join(f"In English: {line}" for line in messages[-1]["content"].splitlines())
+
+    def _respond(
+        self,
+        messages: Messages,
+        timeout: Optional[float],
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        with self._lock:
+            self.calls.append(messages)
+        if self.latency:
+            timed_out = timeout is not None and self.latency > timeout
+            delay = timeout if timed_out else self.latency
+            if cancel is not None and cancel.wait(delay):
+                raise BackendCancelled("request cancelled")
+            if cancel is None:
+                time.sleep(delay)
+            if timed_out:
+                raise TimeoutError("fake backend timed out")
+        _check_cancelled(cancel)
+        return self.responder(messages)
+
+    def complete(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        return self._respond(messages, timeout, cancel)
+
+    def stream(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        content = self._respond(messages, timeout, cancel)
+        for i in range(0, len(content), 8):
+            _check_cancelled(cancel)
+            yield content[i:i + 8]
+
+    def complete_batch(
+        self,
+        requests: List[Messages],
+        temperature: float = 0.3,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        return [self._respond(messages, timeout) for messages in requests]
+
+
+class FailoverBackend:
+    """
+    Uses the primary backend, switching to the fallback when it is rate limited.
+
+    A stream only fails over if the primary is rate limited before yielding
+    anything.
+    """
+
+    def __init__(self, primary: LLMBackend, fallback: LLMBackend):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+        self.failovers = 0
+
+    def complete(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        try:
+            return self.primary.complete(messages, temperature, timeout, cancel)
+        except BackendRateLimited:
+            self.failovers += 1
+            return self.fallback.complete(messages, temperature, timeout, cancel)
+
+    def stream(
+        self,
+        messages: Messages,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        started = False
+        try:
+            for piece in self.primary.stream(messages, temperature, timeout, cancel):
+                started = True
+                yield piece
+        except BackendRateLimited:
+            if started:
+                raise
+            self.failovers += 1
+            yield from self.fallback.stream(messages, temperature, timeout, cancel)
+
+    def complete_batch(
+        self,
+        requests: List[Messages],
+        temperature: float = 0.3,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_CONCURRENCY, len(requests)))) as pool:
+            return list(pool.map(lambda messages: self.complete(messages, temperature, timeout), requests))
+
+
+def create_backend(kind: str, env: Optional[Dict[str, str]] = None) -> LLMBackend:
+    """
+    Build a backend from environment-style settings.
+
+    Settings:
+        GROQ_API_KEY: required for "groq"
+        LLM_BASE_URL, LLM_API_KEY: URL (required) and key for "openai"
+        LLM_MODEL: model name for "groq" and "openai"
+        LLM_FAKE_LATENCY: seconds per request for "fake"
+    """
+    env = os.environ if env is None else env
+    model = env.get("LLM_MODEL") or DEFAULT_MODEL
+
+    if kind == "groq":
+        api_key = env.get("GROQ_API_KEY")
+        if not api_key:
+            raise BackendConfigError("GROQ_API_KEY not found in environment variables.")
+        return GroqBackend(api_key, model)
+    if kind == "openai":
+        base_url = env.get("LLM_BASE_URL")
+        if not base_url:
+            raise BackendConfigError("LLM_BASE_URL is required for the openai backend.")
+        return OpenAICompatibleBackend(base_url, model, env.get("LLM_API_KEY"))
+    if kind == "fake":
+        return FakeBackend(float(env.get("LLM_FAKE_LATENCY") or 0))
+    raise BackendConfigError(f"Unknown LLM backend: {kind!r} (expected groq, openai or fake)")
+
+
+def load_backend(env: Optional[Dict[str, str]] = None) -> LLMBackend:
+    """
+    Build the backend selected by LLM_BACKEND (default "groq").
+
+    If LLM_FALLBACK_BACKEND is set, requests that are rate limited on the
+    primary backend are retried on the fallback.
+    """
+    env = os.environ if env is None else env
+    backend = create_backend(env.get("LLM_BACKEND") or "groq", env)
+    fallback = env.get("LLM_FALLBACK_BACKEND")
+    if fallback:
+        backend = FailoverBackend(backend, create_backend(fallback, env))
+    return backend
+
+
+def get_llm_backend() -> LLMBackend:
+    """Get or create the process-wide backend from the environment."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = load_backend()
+    return _backend
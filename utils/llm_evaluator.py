@@ -1,6 +1,10 @@
 import json
-from typing import Dict, Any
-from groq import Groq
+from typing import Dict, Any, Optional
+
+from utils.hedging import HedgedCaller
+from utils.llm_backend import LLMBackend
+from utils.profiler import timed
+from utils.scheduler import INTERACTIVE, RequestScheduler, SchedulerRejected, current_user_id, get_scheduler
 
 
 def extract_json(text: str) -> str:
@@ -67,23 +71,53 @@ Scoring guidelines:
 Be encouraging but accurate. Focus on learning."""
 
 
+# Seconds a learner waits for a grade before the evaluation gives up
+EVALUATION_DEADLINE = 20.0
+
+_evaluation_caller = None
+
+
+def get_evaluation_caller() -> HedgedCaller:
+    """Get or create the hedged caller shared by all evaluations."""
+    global _evaluation_caller
+    if _evaluation_caller is None:
+        _evaluation_caller = HedgedCaller(deadline=EVALUATION_DEADLINE)
+    return _evaluation_caller
+
+
+@timed()
 def evaluate_translation(
     french_sentence: str,
     reference_english: str,
     user_french: str,
-    groq_client: Groq
+    backend: LLMBackend,
+    caller: Optional[HedgedCaller] = None,
+    scheduler: Optional[RequestScheduler] = None
 ) -> Dict[str, Any]:
     """
     Use LLM to evaluate user's French translation.
 
+    The request runs under a deadline and is hedged: if it is slower than
+    recent p95 latency, a duplicate is sent and the first answer wins. The
+    slower request is cancelled through the backend, which drops its
+    connection. Each attempt holds its own interactive scheduler slot and
+    waits for it no longer than the time left before the deadline.
+
     Args:
         french_sentence: The original French sentence
         reference_english: The English translation shown to user
         user_french: The user's French translation attempt
-        groq_client: Groq client instance
+        backend: LLM backend to send the request to
+        caller: Hedged caller to use (defaults to the shared one)
+        scheduler: Scheduler granting LLM slots (defaults to the shared one)
 
     Returns:
-        Dictionary with evaluation results including score and errors
+        Dictionary with evaluation results including score and errors.
+        If no grade was obtained, "error" is set to "timeout" or "failed"
+        and "feedback" explains why; such results are not grades.
+
+    Raises:
+        SchedulerRejected: if no attempt could get a scheduler slot
     """
     prompt = EVALUATION_PROMPT.format(
         french_sentence=french_sentence,
@@ -91,11 +125,16 @@ def evaluate_translation(
         user_french=user_french
     )
 
-    raw_content = None
-    try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+    scheduler = scheduler or get_scheduler()
+    # Attempts run on the caller's threads, outside the Streamlit session
+    user_id = current_user_id()
+
+    def slot(cancel, seconds_left):
+        return scheduler.slot(INTERACTIVE, user_id, timeout=seconds_left, cancel=cancel)
+
+    def request(cancel, seconds_left):
+        return backend.complete(
+            [
                 {
                     "role": "system",
                     "content": "You are a French language evaluation assistant. Always respond with valid JSON only."
@@ -106,9 +145,13 @@ def evaluate_translation(
                 }
             ],
             temperature=0.2,
+            timeout=seconds_left,
+            cancel=cancel,
         )
 
-        raw_content = response.choices[0].message.content
+    raw_content = None
+    try:
+        raw_content = (caller or get_evaluation_caller()).call(request, gate=slot)
         cleaned_json = extract_json(raw_content)
         result = json.loads(cleaned_json)
         return result
@@ -127,8 +170,21 @@ def evaluate_translation(
             "feedback": "Unable to parse evaluation. Please try again.",
             "corrected_version": user_french
         }
+    except SchedulerRejected:
+        raise
+    except TimeoutError:
+        return {
+            "error": "timeout",
+            "overall_score": 0,
+            "meaning_preserved": False,
+            "critical_errors": [],
+            "minor_errors": [],
+            "feedback": "The evaluator took too long to respond. Please try again.",
+            "corrected_version": user_french
+        }
     except Exception as e:
         return {
+            "error": "failed",
             "overall_score": 0,
             "meaning_preserved": False,
             "critical_errors": [],
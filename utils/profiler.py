@@ -0,0 +1,324 @@
+"""
+Opt-in per-rerun profiler for finding where page time goes.
+
+Enabled by the APP_PROFILE environment variable when the app starts:
+
+    APP_PROFILE=1           timing spans around reruns and key functions
+    APP_PROFILE=cprofile    spans, plus a cProfile of every rerun
+
+When disabled, @timed returns the function unchanged and span() returns a
+shared no-op context manager, so instrumented code pays next to nothing.
+"""
+
+import cProfile
+import functools
+import marshal
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from typing import (
+    Any, Callable, ContextManager, Deque, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+)
+
+from utils.scheduler import current_user_id
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+PROFILE_MODES = ("1", "spans", "cprofile")
+
+# Reruns kept for the developer panel and dumps
+RING_SIZE = 50
+
+_NULL_SPAN = nullcontext()
+
+_profiler = None
+
+
+class Span(NamedTuple):
+    """One timed call inside a rerun."""
+
+    path: Tuple[str, ...]
+    start_ms: float
+    duration_ms: float
+
+
+class RerunProfile:
+    """Spans recorded during one script or fragment run of a session."""
+
+    def __init__(self, page: str, session_id: str):
+        self.page = page
+        self.session_id = session_id
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration_ms = 0.0
+        self.interrupted = False
+        self.spans: List[Span] = []
+        self.stack: List[str] = [page]
+        self.cprofile: Optional[cProfile.Profile] = None
+
+    def elapsed_ms(self) -> float:
+        return 1000 * (time.perf_counter() - self.start)
+
+    def self_times(self) -> Dict[Tuple[str, ...], float]:
+        """Milliseconds spent in each span path excluding its child spans."""
+        times: Dict[Tuple[str, ...], float] = defaultdict(float)
+        times[(self.page,)] += self.duration_ms
+        for span in self.spans:
+            times[span.path] += span.duration_ms
+            times[span.path[:-1]] -= span.duration_ms
+        return {path: max(ms, 0.0) for path, ms in times.items()}
+
+
+class Profiler:
+    """
+    Records timing spans per rerun into a ring buffer of recent reruns.
+
+    A rerun is opened by begin_rerun() at the top of a page script and
+    closed by end_rerun() at the bottom. A script interrupted by st.rerun()
+    or st.stop() is closed when its session starts the next one. A span
+    outside an open rerun (a fragment rerun) is recorded as a rerun of its
+    own, open until that span ends, so the spans nested in it are recorded
+    inside it.
+    """
+
+    def __init__(self, enabled: bool = False, use_cprofile: bool = False, ring_size: int = RING_SIZE):
+        self.enabled = enabled
+        self.use_cprofile = enabled and use_cprofile
+        self._lock = threading.Lock()
+        # Session ID -> rerun begun by its script; (session ID, thread ID) ->
+        # rerun opened by an outermost span in that thread
+        self._open: Dict[Hashable, RerunProfile] = {}
+        self._recent: Deque[RerunProfile] = deque(maxlen=ring_size)
+
+    def begin_rerun(self, page: str) -> None:
+        """Start timing a run of `page` for the current session."""
+        if not self.enabled:
+            return
+        session_id = current_user_id()
+        with self._lock:
+            stale = self._open.pop(session_id, None)
+        if stale is not None:
+            self._close(stale, interrupted=True)
+        rerun = RerunProfile(page, session_id)
+        if self.use_cprofile:
+            rerun.cprofile = cProfile.Profile()
+            try:
+                rerun.cprofile.enable()
+            except ValueError:
+                # Another profiler is active on this thread
+                rerun.cprofile = None
+        with self._lock:
+            self._open[session_id] = rerun
+
+    def end_rerun(self) -> None:
+        """Finish the current session's rerun and add it to the ring buffer."""
+        if not self.enabled:
+            return
+        with self._lock:
+            rerun = self._open.pop(current_user_id(), None)
+        if rerun is not None:
+            self._close(rerun)
+
+    def _close(self, rerun: RerunProfile, interrupted: bool = False) -> None:
+        if interrupted:
+            # Its end was not observed: count it up to its last span
+            rerun.duration_ms = max((s.start_ms + s.duration_ms for s in rerun.spans), default=0.0)
+        else:
+            rerun.duration_ms = rerun.elapsed_ms()
+        rerun.interrupted = interrupted
+        if rerun.cprofile is not None:
+            rerun.cprofile.disable()
+        with self._lock:
+            self._recent.append(rerun)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        session_id = current_user_id()
+        # Keyed by thread too: threads outside a session share its ID
+        adhoc_key = (session_id, threading.get_ident())
+        with self._lock:
+            rerun = self._open.get(session_id) or self._open.get(adhoc_key)
+            if rerun is None:
+                # A fragment rerun (or other run without begin_rerun)
+                rerun = RerunProfile(name, session_id)
+                self._open[adhoc_key] = rerun
+            else:
+                adhoc_key = None
+        if adhoc_key is not None:
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._open.pop(adhoc_key, None)
+                self._close(rerun)
+            return
+
+        rerun.stack.append(name)
+        path = tuple(rerun.stack)
+        start_ms = rerun.elapsed_ms()
+        try:
+            yield
+        finally:
+            rerun.stack.pop()
+            rerun.spans.append(Span(path, start_ms, rerun.elapsed_ms() - start_ms))
+
+    def span(self, name: str) -> ContextManager[None]:
+        """Context manager timing a block as `name`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    def timed(self, name: Optional[str] = None) -> Callable[[F], F]:
+        """Decorator timing every call of a function; a no-op when disabled."""
+        def decorate(fn: F) -> F:
+            if not self.enabled:
+                return fn
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self._span(span_name):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def recent(self, session_id: Optional[str] = None) -> List[RerunProfile]:
+        """Recent finished reruns, oldest first, optionally for one session."""
+        with self._lock:
+            reruns = list(self._recent)
+        if session_id is not None:
+            reruns = [r for r in reruns if r.session_id == session_id]
+        return reruns
+
+    def summary(self, reruns: Optional[List[RerunProfile]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Per span name totals over recent reruns.
+
+        Returns:
+            name -> {"calls", "total_ms", "mean_ms", "max_ms"}, with the page
+            names covering whole reruns
+        """
+        durations: Dict[str, List[float]] = defaultdict(list)
+        for rerun in self.recent() if reruns is None else reruns:
+            durations[rerun.page].append(rerun.duration_ms)
+            for span in rerun.spans:
+                durations[span.path[-1]].append(span.duration_ms)
+        return {
+            name: {
+                "calls": len(values),
+                "total_ms": sum(values),
+                "mean_ms": sum(values) / len(values),
+                "max_ms": max(values),
+            }
+            for name, values in sorted(durations.items(), key=lambda item: -sum(item[1]))
+        }
+
+    def collapsed_stacks(self, reruns: Optional[List[RerunProfile]] = None) -> str:
+        """
+        Span self-times in collapsed-stack format ("page;span;child <us>").
+
+        This is the input format of flamegraph.pl, speedscope and inferno.
+        """
+        totals: Dict[Tuple[str, ...], float] = defaultdict(float)
+        for rerun in self.recent() if reruns is None else reruns:
+            for path, ms in rerun.self_times().items():
+                totals[path] += ms
+        return "".join(
+            f"{';'.join(path)} {round(ms * 1000)}\n" for path, ms in sorted(totals.items()) if round(ms * 1000)
+        )
+
+    def cprofile_stats(self, reruns: Optional[List[RerunProfile]] = None) -> Optional[pstats.Stats]:
+        """cProfile statistics merged over recent reruns, if cProfile is on."""
+        profiles = [r.cprofile for r in (self.recent() if reruns is None else reruns) if r.cprofile is not None]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def dump_cprofile(self, path: str) -> bool:
+        """Write merged cProfile statistics for pstats/snakeviz; False if none."""
+        stats = self.cprofile_stats()
+        if stats is None:
+            return False
+        stats.dump_stats(path)
+        return True
+
+
+def get_profiler() -> Profiler:
+    """Get or create the process-wide profiler configured by APP_PROFILE."""
+    global _profiler
+    if _profiler is None:
+        mode = os.getenv("APP_PROFILE", "").strip().lower()
+        _profiler = Profiler(enabled=mode in PROFILE_MODES, use_cprofile=mode == "cprofile")
+    return _profiler
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """Time calls of the decorated function with the process-wide profiler."""
+    return get_profiler().timed(name)
+
+
+def span(name: str) -> ContextManager[None]:
+    """Time a block with the process-wide profiler."""
+    return get_profiler().span(name)
+
+
+def render_profiler_panel() -> None:
+    """Developer panel with the latest rerun breakdown; shown only when profiling."""
+    profiler = get_profiler()
+    if not profiler.enabled:
+        return
+
+    import streamlit as st
+
+    reruns = profiler.recent(current_user_id())
+    with st.expander("Profiler", expanded=False):
+        # Tables are costly to render, so they are only built on request
+        if not st.toggle("Show timings", key="profiler_show_timings"):
+            st.caption(f"{len(reruns)} runs recorded for this session.")
+            return
+        if not reruns:
+            st.caption("No finished reruns yet.")
+            return
+
+        last = reruns[-1]
+        status = " (interrupted)" if last.interrupted else ""
+        st.caption(f"Last run: {last.page}, {last.duration_ms:.1f} ms{status}")
+        st.dataframe(
+            [
+                {"span": " › ".join(span.path[1:]), "start ms": round(span.start_ms, 1),
+                 "ms": round(span.duration_ms, 1)}
+                for span in sorted(last.spans, key=lambda s: s.start_ms)
+            ],
+            hide_index=True,
+        )
+
+        st.caption(f"Last {len(reruns)} runs of this session")
+        st.dataframe(
+            [
+                {"name": name, "calls": int(row["calls"]), "mean ms": round(row["mean_ms"], 1),
+                 "max ms": round(row["max_ms"], 1), "total ms": round(row["total_ms"], 1)}
+                for name, row in profiler.summary(reruns).items()
+            ],
+            hide_index=True,
+        )
+
+        st.download_button(
+            "Download flamegraph stacks",
+            profiler.collapsed_stacks(reruns),
+            file_name="reruns.collapsed",
+        )
+        stats = profiler.cprofile_stats(reruns)
+        if stats is not None:
+            st.download_button(
+                "Download cProfile",
+                marshal.dumps(stats.stats),
+                file_name="reruns.prof",
+            )
@@ -0,0 +1,286 @@
+"""Process-wide scheduler for LLM requests sharing one Groq quota."""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+# Priority classes, most urgent first
+INTERACTIVE = 0
+PREFETCH = 1
+BULK = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PREFETCH: "prefetch", BULK: "bulk"}
+
+DEFAULT_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+
+# Slots only interactive requests may take, so bulk and prefetch work can
+# never hold every slot while a learner waits for grading
+DEFAULT_RESERVED_INTERACTIVE = 1
+
+# Requests allowed to wait in each class before new ones are rejected
+DEFAULT_MAX_QUEUE_DEPTH = {INTERACTIVE: 64, PREFETCH: 16, BULK: 32}
+
+# Once this many requests are waiting in total, prefetch and bulk requests
+# are rejected and queued ones are shed to make room for interactive ones
+DEFAULT_SHED_THRESHOLD = 48
+
+WAIT_SAMPLES = 1000
+
+# Seconds between checks of a waiting request's cancel event
+CANCEL_POLL_INTERVAL = 0.02
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class SchedulerRejected(Exception):
+    """Raised when a request is refused by admission control or shed from the queue."""
+
+
+class _Ticket:
+    """A request waiting for a slot."""
+
+    __slots__ = ("priority", "user_id", "enqueued_at", "state", "cancel")
+
+    def __init__(self, priority: int, user_id: str, cancel: Optional[threading.Event] = None):
+        self.priority = priority
+        self.user_id = user_id
+        self.enqueued_at = time.monotonic()
+        self.state = "waiting"
+        self.cancel = cancel
+
+
+class RequestScheduler:
+    """
+    Grants a limited number of concurrent LLM slots by priority.
+
+    Higher priority classes are always served first. Within a class, users
+    are served round-robin, so one user with many queued requests (a long
+    video being translated) cannot starve the others. `reserved_interactive`
+    slots are kept for interactive requests: prefetch and bulk requests only
+    run while fewer than max_concurrent - reserved_interactive are in flight.
+    At least one slot is always left to them.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_queue_depth: Optional[Dict[int, int]] = None,
+        shed_threshold: int = DEFAULT_SHED_THRESHOLD,
+        reserved_interactive: int = DEFAULT_RESERVED_INTERACTIVE
+    ):
+        self.max_concurrent = max_concurrent
+        self.reserved_interactive = max(0, min(reserved_interactive, max_concurrent - 1))
+        self.max_queue_depth = {**DEFAULT_MAX_QUEUE_DEPTH, **(max_queue_depth or {})}
+        self.shed_threshold = shed_threshold
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        # priority -> user -> that user's waiting tickets, oldest first
+        self._queues: Dict[int, Dict[str, Deque[_Ticket]]] = {p: {} for p in PRIORITY_NAMES}
+        # priority -> users with waiting tickets, next to be served first
+        self._turns: Dict[int, Deque[str]] = {p: deque() for p in PRIORITY_NAMES}
+        self._waits: Dict[int, Deque[float]] = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self._counters: Dict[int, Dict[str, int]] = {
+            p: {"admitted": 0, "rejected": 0, "shed": 0, "cancelled": 0, "completed": 0} for p in PRIORITY_NAMES
+        }
+
+    def _depth(self, priority: int) -> int:
+        return sum(len(tickets) for tickets in self._queues[priority].values())
+
+    def _total_depth(self) -> int:
+        return sum(self._depth(priority) for priority in PRIORITY_NAMES)
+
+    def _remove(self, ticket: _Ticket) -> None:
+        tickets = self._queues[ticket.priority].get(ticket.user_id)
+        if tickets is None or ticket not in tickets:
+            return
+        tickets.remove(ticket)
+        if not tickets:
+            del self._queues[ticket.priority][ticket.user_id]
+            self._turns[ticket.priority].remove(ticket.user_id)
+
+    def _shed_one(self, below: int) -> bool:
+        """Shed the newest waiting ticket with a lower priority than `below`."""
+        for priority in sorted(PRIORITY_NAMES, reverse=True):
+            if priority <= below:
+                break
+            newest = None
+            for tickets in self._queues[priority].values():
+                if newest is None or tickets[-1].enqueued_at > newest.enqueued_at:
+                    newest = tickets[-1]
+            if newest is not None:
+                self._remove(newest)
+                newest.state = "shed"
+                self._counters[priority]["shed"] += 1
+                self._condition.notify_all()
+                return True
+        return False
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting tickets. Caller holds the lock."""
+        granted = False
+        while self._in_flight < self.max_concurrent:
+            shared_free = self._in_flight < self.max_concurrent - self.reserved_interactive
+            priority = next(
+                (p for p in sorted(PRIORITY_NAMES) if self._turns[p] and (p == INTERACTIVE or shared_free)),
+                None
+            )
+            if priority is None:
+                break
+            user_id = self._turns[priority].popleft()
+            tickets = self._queues[priority][user_id]
+            ticket = tickets.popleft()
+            if tickets:
+                self._turns[priority].append(user_id)
+            else:
+                del self._queues[priority][user_id]
+
+            if ticket.cancel is not None and ticket.cancel.is_set():
+                # Abandoned while waiting: never hand it a slot
+                ticket.state = "cancelled"
+                granted = True
+                continue
+            ticket.state = "granted"
+            self._in_flight += 1
+            self._waits[priority].append(time.monotonic() - ticket.enqueued_at)
+            granted = True
+        if granted:
+            self._condition.notify_all()
+
+    def acquire(
+        self,
+        priority: int,
+        user_id: str = "anonymous",
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Wait for a slot.
+
+        Setting `cancel` while the request waits drops it from the queue,
+        so an abandoned request stops counting against queue limits.
+
+        Raises:
+            SchedulerRejected: if the class queue is full, the scheduler is
+                shedding this class, the request was shed or cancelled
+                while waiting, or `timeout` seconds passed without a slot
+        """
+        if priority not in PRIORITY_NAMES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        with self._condition:
+            counters = self._counters[priority]
+            if cancel is not None and cancel.is_set():
+                counters["cancelled"] += 1
+                raise SchedulerRejected(f"{PRIORITY_NAMES[priority]} request cancelled")
+            if self._depth(priority) >= self.max_queue_depth[priority]:
+                counters["rejected"] += 1
+                raise SchedulerRejected(f"{PRIORITY_NAMES[priority]} queue is full")
+            if self._total_depth() >= self.shed_threshold:
+                if priority != INTERACTIVE or not self._shed_one(priority):
+                    counters["rejected"] += 1
+                    raise SchedulerRejected(f"Overloaded, {PRIORITY_NAMES[priority]} request shed")
+
+            ticket = _Ticket(priority, user_id, cancel)
+            if user_id not in self._queues[priority]:
+                self._queues[priority][user_id] = deque()
+                self._turns[priority].append(user_id)
+            self._queues[priority][user_id].append(ticket)
+            self._dispatch()
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while ticket.state == "waiting":
+                if cancel is not None and cancel.is_set():
+                    self._remove(ticket)
+                    ticket.state = "cancelled"
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    counters["rejected"] += 1
+                    raise SchedulerRejected(f"Timed out waiting for a {PRIORITY_NAMES[priority]} slot")
+                if cancel is not None:
+                    remaining = CANCEL_POLL_INTERVAL if remaining is None else min(remaining, CANCEL_POLL_INTERVAL)
+                self._condition.wait(remaining)
+
+            if ticket.state == "shed":
+                raise SchedulerRejected(f"Overloaded, {PRIORITY_NAMES[priority]} request shed")
+            if ticket.state == "cancelled":
+                counters["cancelled"] += 1
+                raise SchedulerRejected(f"{PRIORITY_NAMES[priority]} request cancelled")
+            counters["admitted"] += 1
+
+    def release(self, priority: int) -> None:
+        """Return a slot obtained with acquire()."""
+        with self._condition:
+            self._in_flight -= 1
+            self._counters[priority]["completed"] += 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self,
+        priority: int,
+        user_id: str = "anonymous",
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[None]:
+        """Context manager holding a slot for the duration of the block."""
+        self.acquire(priority, user_id, timeout, cancel)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def run(self, priority: int, user_id: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call `fn` while holding a slot."""
+        with self.slot(priority, user_id):
+            return fn(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of queue depth, wait times and counters per priority class.
+
+        Wait times are in milliseconds over the last WAIT_SAMPLES grants.
+        """
+        with self._condition:
+            classes = {}
+            for priority, name in PRIORITY_NAMES.items():
+                waits: List[float] = sorted(self._waits[priority])
+                classes[name] = {
+                    "queue_depth": self._depth(priority),
+                    "waiting_users": len(self._turns[priority]),
+                    "wait_mean_ms": 1000 * sum(waits) / len(waits) if waits else 0.0,
+                    "wait_p95_ms": 1000 * waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                    "wait_max_ms": 1000 * waits[-1] if waits else 0.0,
+                    **self._counters[priority],
+                }
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrent": self.max_concurrent,
+                "reserved_interactive": self.reserved_interactive,
+                "queue_depth": self._total_depth(),
+                "classes": classes,
+            }
+
+
+def get_scheduler() -> RequestScheduler:
+    """Get or create the process-wide scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+    return _scheduler
+
+
+def current_user_id() -> str:
+    """Identify the current Streamlit session for per-user fairness."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return "anonymous"
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else "anonymous"
@@ -1,6 +1,8 @@
 import re
 from typing import List, Tuple
 
+from utils.profiler import timed
+
 # French abbreviations that should NOT end a sentence
 FRENCH_ABBREVIATIONS = {
     'M', 'Mme', 'Mlle', 'Dr', 'Prof', 'Sr', 'Jr', 'St', 'Ste',
@@ -9,6 +11,7 @@ FRENCH_ABBREVIATIONS = {
 }
 
 
+@timed()
 def parse_sentences(text: str) -> List[str]:
     """
     Parse French or English text into sentences, handling edge cases.
@@ -0,0 +1,204 @@
+"""Translation memory of French -> English sentence pairs shared across videos."""
+
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_MEMORY_PATH = "translation_memory.json"
+
+# Minimum character n-gram Jaccard similarity for a fuzzy match
+DEFAULT_THRESHOLD = 0.9
+NGRAM_SIZE = 3
+
+# Words that change a sentence's meaning however similar it otherwise is.
+# A fuzzy match whose differing words include one of these, or a number,
+# is rejected.
+MEANING_WORDS = {
+    "ne", "n'", "pas", "jamais", "plus", "rien", "aucun", "aucune", "personne",
+    "guère", "point", "ni", "nul", "nulle", "sans",
+    "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf", "dix",
+    "onze", "douze", "treize", "quatorze", "quinze", "seize", "vingt", "trente",
+    "quarante", "cinquante", "soixante", "cent", "cents", "mille", "million", "millions",
+}
+
+TOKEN_PATTERN = re.compile(r"\w+'|\w+")
+
+# A sentence ending in "?", possibly followed by other punctuation or quotes
+QUESTION_PATTERN = re.compile(r"\?[^\w]*$")
+
+_memory = None
+
+
+def normalize_sentence(text: str) -> str:
+    """
+    Normalize a sentence for matching.
+
+    Lowercases, unifies apostrophes, drops punctuation and collapses
+    whitespace, so "Merci d’avoir regardé !" and "merci d'avoir regardé"
+    share the same key. A final question mark is kept, since "Tu viens
+    demain ?" and "Tu viens demain." translate differently.
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    question = QUESTION_PATTERN.search(text) is not None
+    text = text.replace("’", "'")
+    text = re.sub(r"[^\w']+", " ", text)
+    words = text.split()
+    if question:
+        words.append("?")
+    return " ".join(words)
+
+
+def ngrams(normalized: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Character n-grams of a normalized sentence, padded at the edges."""
+    padded = f" {normalized} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two n-gram sets."""
+    if not a and not b:
+        return 1.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def changes_meaning(a: str, b: str) -> bool:
+    """
+    Whether two normalized sentences differ by a negation, a number, or
+    by one being a question.
+
+    Compares the sentences word by word (elided "n'" counts as a word) and
+    looks at the words found in only one of them.
+    """
+    if a.endswith("?") != b.endswith("?"):
+        return True
+    differing = Counter(TOKEN_PATTERN.findall(a))
+    differing.subtract(TOKEN_PATTERN.findall(b))
+    return any(
+        count and (token in MEANING_WORDS or any(c.isdigit() for c in token))
+        for token, count in differing.items()
+    )
+
+
+class TranslationMemory:
+    """
+    Stores French -> English sentence pairs and finds exact or near matches.
+
+    Exact matches are looked up by normalized sentence. Near-duplicates are
+    found through an inverted index of character n-grams: only entries that
+    share one of the query's rarest n-grams are considered (prefix
+    filtering), then each candidate is verified by Jaccard similarity and
+    rejected if it differs from the query by a negation, a number, or by
+    one being a question.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: float = DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._pairs: List[Tuple[str, str]] = []
+        self._exact: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._grams: List[Set[str]] = []
+        self._index: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def add(self, french: str, english: str) -> None:
+        """Add a sentence pair, replacing any entry with the same normalized key."""
+        key = normalize_sentence(french)
+        if not key or not english.strip():
+            return
+        with self._lock:
+            if key in self._exact:
+                self._pairs[self._exact[key]] = (french, english)
+                return
+            entry_id = len(self._pairs)
+            grams = ngrams(key)
+            self._pairs.append((french, english))
+            self._exact[key] = entry_id
+            self._keys.append(key)
+            self._grams.append(grams)
+            for gram in grams:
+                self._index.setdefault(gram, []).append(entry_id)
+
+    def lookup(self, french: str) -> Optional[Tuple[str, float]]:
+        """
+        Find a stored translation for a French sentence.
+
+        Returns:
+            (english, similarity) for the best match at or above the
+            threshold, with similarity 1.0 for exact matches, or None
+        """
+        key = normalize_sentence(french)
+        if not key:
+            return None
+
+        with self._lock:
+            entry_id = self._exact.get(key)
+            if entry_id is not None:
+                return self._pairs[entry_id][1], 1.0
+
+            grams = ngrams(key)
+            # Any entry sharing ceil(t * |grams|) n-grams must share one of
+            # the first |grams| - ceil(t * |grams|) + 1 of them
+            required = math.ceil(self.threshold * len(grams) - 1e-9)
+            prefix = sorted(grams, key=lambda g: len(self._index.get(g, ())))
+            prefix = prefix[:len(grams) - required + 1]
+
+            candidates = Counter()
+            for gram in prefix:
+                candidates.update(self._index.get(gram, ()))
+
+            best_id, best_score = None, 0.0
+            for candidate_id in candidates:
+                candidate_grams = self._grams[candidate_id]
+                size_ratio = min(len(grams), len(candidate_grams)) / max(len(grams), len(candidate_grams))
+                if size_ratio < self.threshold:
+                    continue
+                score = jaccard(grams, candidate_grams)
+                if score > best_score and not changes_meaning(key, self._keys[candidate_id]):
+                    best_id, best_score = candidate_id, score
+
+        if best_id is None or best_score < self.threshold:
+            return None
+        return self._pairs[best_id][1], best_score
+
+    @classmethod
+    def load(cls, path: str, threshold: float = DEFAULT_THRESHOLD) -> "TranslationMemory":
+        """Load a memory from a JSON file, or start an empty one if it is missing."""
+        memory = cls(path, threshold)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for french, english in data.get("entries", []):
+                memory.add(french, english)
+        return memory
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the memory to its JSON file."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given for translation memory.")
+        with self._lock:
+            data = {"version": 1, "entries": [list(pair) for pair in self._pairs]}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Get or load the process-wide translation memory."""
+    global _memory
+    if _memory is None:
+        _memory = TranslationMemory.load(DEFAULT_MEMORY_PATH)
+    return _memory